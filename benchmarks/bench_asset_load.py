@@ -0,0 +1,65 @@
+# benchmarks/bench_asset_load.py
+# 冷启动加载图片的耗时：资源包 (mmap + frombuffer) 对比散装 PNG (解码 + convert_alpha)。
+# 每次测量都在新的子进程里做，进程内的缓存都是空的 (系统的文件缓存除外)。
+# 用法：python -m benchmarks.bench_asset_load [次数]
+import os
+import sys
+import time
+import subprocess
+import statistics
+
+# 无窗口运行
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _child(mode):
+    """子进程：只测加载全部图片这一段，打印毫秒数"""
+    import pygame
+    import settings
+    settings.USE_ASSET_BUNDLE = (mode == "bundle")
+
+    pygame.display.init()
+    pygame.display.set_mode((640, 480))
+
+    from core.assets import assets, IMAGE_DIR
+    names = [os.path.splitext(f)[0] for f in sorted(os.listdir(IMAGE_DIR)) if f.endswith(".png")]
+
+    start = time.perf_counter()
+    for name in names:
+        assets.image(name)
+    print((time.perf_counter() - start) * 1000)
+
+
+def _run_child(mode):
+    result = subprocess.run([sys.executable, "-m", "benchmarks.bench_asset_load", "--child", mode],
+                            cwd=BASE_PATH, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    args = sys.argv[1:]
+    runs = int(args[0]) if args else 20
+
+    from core import asset_bundle
+    if not os.path.exists(asset_bundle.bundle_path()):
+        import pygame
+        pygame.init()
+        images, fonts, size = asset_bundle.build()
+        print(f"还没有资源包，先打包：{images} 张图片、{fonts} 个字体 ({size / 1024:.0f} KB)")
+
+    print(f"每种方式 {runs} 次冷启动")
+    print(f"{'方式':<10}{'中位数(ms)':>12}{'最快(ms)':>12}{'最慢(ms)':>12}")
+    for mode in ("loose", "bundle"):
+        # 两种方式交替也行，这里分开跑让系统缓存对两边都是热的
+        _run_child(mode)
+        samples = [_run_child(mode) for _ in range(runs)]
+        print(f"{mode:<10}{statistics.median(samples):>12.2f}{min(samples):>12.2f}{max(samples):>12.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        _child(sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,322 @@
+# benchmarks/bench_render.py
+# 渲染开销基准：无窗口 (SDL dummy) 下在 720p/1080p/1440p/4K 各跑一遍，
+#   - BackgroundRenderer 的 9 种背景 x 3 个难度
+#   - SnakeGame (纯色背景和旋转条栅背景)、MainMenu、LoginScene 的 draw
+# 报告每帧耗时的 p50/p95/p99 和每帧分配的内存，结果写成 JSON。内存分两部分：
+#   alloc_*    tracemalloc 看得到的 Python 对象和 numpy 数组
+#   surface_*  新建的 SDL Surface 个数和像素字节 (包住 pygame.Surface 和 pygame.transform 的函数来数；
+#              Surface.copy/convert、Font.render 这些 C 方法包不到，不在统计里)
+# 每一项都从清空的背景缓存开始 (结果和顺序无关)：首帧单独记，然后把预算放得下的图集帧预热好，计时的是稳定状态。
+# 计时的帧均匀铺满一整圈旋转，图集只放得下一部分角度时，缓存命中和现场计算的帧按实际比例混在一起。
+# 用法：
+#   python -m benchmarks.bench_render [--sizes 720p,1080p] [--frames 120] [--out 结果.json]
+#   python -m benchmarks.bench_render --baseline 旧结果.json [--tolerance 0.2]   # p95 变慢超过容差时返回 1
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+
+# 无窗口运行
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import settings
+from settings import DIFFICULTY_LEVELS
+from core.bg_renderer import BackgroundRenderer
+
+SIZES = {
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '1440p': (2560, 1440),
+    '4k': (3840, 2160),
+}
+
+# 比较基线时低于这个差值 (毫秒) 的变化当作噪声
+NOISE_FLOOR_MS = 0.5
+
+
+def percentile(sorted_values, p):
+    """线性插值的百分位数 (sorted_values 已排好序)"""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class SurfaceCounter:
+    """with 块里统计新建的 Surface：pygame.Surface 换成计数的子类，返回新 Surface 的 transform 函数包一层
+    (传了 dest_surface、画进已有 Surface 的调用不算)"""
+    TRANSFORMS = ("rotate", "rotozoom", "scale", "scale_by", "smoothscale", "smoothscale_by", "flip", "scale2x")
+
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+        self._saved = {}
+
+    def _add(self, surf):
+        self.count += 1
+        self.bytes += surf.get_pitch() * surf.get_height()
+
+    def _wrap(self, func):
+        def wrapped(*args, **kwargs):
+            surf = func(*args, **kwargs)
+            if not any(surf is arg for arg in args) and surf is not kwargs.get('dest_surface'):
+                self._add(surf)
+            return surf
+        return wrapped
+
+    def __enter__(self):
+        counter = self
+        surface_type = pygame.Surface
+
+        class CountingSurface(surface_type):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                counter._add(self)
+
+        self._saved = {(pygame, 'Surface'): surface_type}
+        pygame.Surface = CountingSurface
+        for name in self.TRANSFORMS:
+            func = getattr(pygame.transform, name, None)
+            if func is not None:
+                self._saved[(pygame.transform, name)] = func
+                setattr(pygame.transform, name, self._wrap(func))
+        return self
+
+    def __exit__(self, *exc):
+        for (module, name), value in self._saved.items():
+            setattr(module, name, value)
+        self._saved = {}
+
+
+def measure(draw, before_frame, frames, alloc_frames, warm_up=None):
+    """draw(帧号) 画一帧，before_frame(帧号) 是不计时的准备工作 (比如 update)。
+    清空背景缓存后先单独计首帧，再跑 warm_up() (单独计时)，然后计 frames 帧的耗时，
+    最后开 tracemalloc 跑 alloc_frames 帧统计分配 (同时数新建的 Surface)"""
+    _reset_background_caches()
+    before_frame(0)
+    start = time.perf_counter()
+    draw(0)
+    first_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    if warm_up is not None:
+        warm_up()
+    warmup_ms = (time.perf_counter() - start) * 1000
+
+    times = []
+    for i in range(1, frames + 1):
+        before_frame(i)
+        start = time.perf_counter()
+        draw(i)
+        times.append((time.perf_counter() - start) * 1000)
+
+    # tracemalloc 和 Surface 计数本身都很慢，不和计时混在一起；计数器在 tracemalloc 之外装好，它自己的分配不算
+    peak_alloc = 0
+    surface_count = surface_bytes = 0
+    with SurfaceCounter() as counter:
+        tracemalloc.start()
+        base, _ = tracemalloc.get_traced_memory()
+        for i in range(frames + 1, frames + 1 + alloc_frames):
+            before_frame(i)
+            current, _ = tracemalloc.get_traced_memory()
+            count, nbytes = counter.count, counter.bytes
+            tracemalloc.reset_peak()
+            draw(i)
+            _, peak = tracemalloc.get_traced_memory()
+            peak_alloc = max(peak_alloc, peak - current)
+            surface_count = max(surface_count, counter.count - count)
+            surface_bytes = max(surface_bytes, counter.bytes - nbytes)
+        retained = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+
+    times.sort()
+    return {
+        'first_ms': round(first_ms, 3),
+        'warmup_ms': round(warmup_ms, 1),
+        'mean_ms': round(sum(times) / len(times), 3),
+        'p50_ms': round(percentile(times, 50), 3),
+        'p95_ms': round(percentile(times, 95), 3),
+        'p99_ms': round(percentile(times, 99), 3),
+        'max_ms': round(times[-1], 3),
+        'alloc_peak_bytes': peak_alloc,
+        'alloc_retained_bytes': retained,
+        # 单帧最多新建的 Surface 个数和像素字节
+        'surface_allocs': surface_count,
+        'surface_alloc_bytes': surface_bytes,
+    }
+
+
+def _frame_time(i):
+    """第 i 帧的时间戳 (按 FPS 连续推进)"""
+    return i * 1000 // settings.FPS
+
+
+# 旋转条栅转一整圈的毫秒数 (角度 = 时间 / 50)
+REVOLUTION_MS = 360 * 50
+
+
+def _reset_background_caches():
+    BackgroundRenderer.set_quality(1.0, 1)
+    BackgroundRenderer._pattern_cache.clear()
+    BackgroundRenderer._atlas_cache.clear()
+    BackgroundRenderer._atlas_bytes = 0
+
+
+def _background_warm_up(screen, mode, diff):
+    """把这个背景会用到的东西都画一遍：旋转条栅一整圈的每个量化角度，棋盘格的两种相位"""
+    def run():
+        if mode in (3, 4, 5):
+            step = BackgroundRenderer._atlas_step()
+            frame_count = int(round(360 / step))
+            coverage = BackgroundRenderer.atlas_coverage()
+            if coverage is not None:
+                # 放不下的角度预热了也存不住，只预热放得下的那些
+                frame_count = coverage[0]
+            for k in range(frame_count):
+                # 角度 = 时间 / 50，取每个量化区间的中点
+                BackgroundRenderer.draw(screen, mode, int((k + 0.5) * step * 50), diff['bg_grid_size'], diff['stripe_width'])
+        else:
+            for t in (0, 1000):
+                BackgroundRenderer.draw(screen, mode, t, diff['bg_grid_size'], diff['stripe_width'])
+    return run
+
+
+class _BenchApp:
+    """场景只需要 app 上的 difficulty 和 change_scene"""
+    def __init__(self, difficulty):
+        self.difficulty = difficulty
+        self.is_running = True
+
+    def change_scene(self, scene_name):
+        pass
+
+    def warm_up_scene(self, scene_name):
+        pass
+
+
+def bench_size(size_name, frames, alloc_frames, report):
+    width, height = SIZES[size_name]
+    screen = pygame.display.set_mode((width, height))
+    settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT = width, height
+    no_prep = lambda i: None
+
+    # 1. 9 种背景 x 3 个难度 (旋转条栅的计时帧均匀分布在一整圈上)
+    for diff_key, diff in DIFFICULTY_LEVELS.items():
+        for mode in range(9):
+            if mode in (3, 4, 5):
+                frame_time = lambda i: i * REVOLUTION_MS // frames
+            else:
+                frame_time = _frame_time
+            draw = lambda i: BackgroundRenderer.draw(screen, mode, frame_time(i), diff['bg_grid_size'], diff['stripe_width'])
+            report(f"{size_name}/bg{mode}/{diff_key}",
+                   measure(draw, no_prep, frames, alloc_frames, _background_warm_up(screen, mode, diff)))
+
+    # 2. 贪吃蛇：每帧先推进一帧的逻辑 (不计时)，再计 draw
+    from games.snake.game import SnakeGame
+    for diff_key, diff in DIFFICULTY_LEVELS.items():
+        game = SnakeGame(_BenchApp(diff_key))
+        for bg_mode in (0, 3):
+            game.bg_mode = bg_mode
+
+            def prep(i):
+                game.update(1000 // settings.FPS)
+                # BaseGame.update 每 5 秒自动切背景，这里固定住
+                game.bg_mode = bg_mode
+
+            report(f"{size_name}/snake_bg{bg_mode}/{diff_key}",
+                   measure(lambda i: game.draw(screen), prep, frames, alloc_frames,
+                           _background_warm_up(screen, bg_mode, diff)))
+
+    # 3. 菜单和登录界面 (静态界面，只有 draw)
+    from games.main_menu import MainMenu
+    from games.login_scene import LoginScene
+    from core.data_manager import DataManager
+    # LoginScene 构造时会开线程连数据库，基准测试不连网
+    DataManager().connect = lambda: None
+    app = _BenchApp('EASY')
+    for name, scene in (('main_menu', MainMenu(app)), ('login', LoginScene(app))):
+        report(f"{size_name}/{name}", measure(lambda i: scene.draw(screen), no_prep, frames, alloc_frames))
+
+
+def compare(results, baseline, tolerance):
+    """和基线比较 p95，返回变慢的条目列表"""
+    regressions = []
+    for key, new in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        limit = old['p95_ms'] * (1 + tolerance)
+        if new['p95_ms'] > limit and new['p95_ms'] - old['p95_ms'] > NOISE_FLOOR_MS:
+            regressions.append((key, old['p95_ms'], new['p95_ms']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无窗口渲染基准")
+    parser.add_argument("--sizes", default=",".join(SIZES), help="逗号分隔：" + ",".join(SIZES))
+    parser.add_argument("--frames", type=int, default=120, help="每项计时的帧数")
+    parser.add_argument("--alloc-frames", type=int, default=10, help="每项统计内存分配的帧数")
+    parser.add_argument("--out", default=os.path.join("cache", "bench_render.json"))
+    parser.add_argument("--baseline", help="之前的结果 JSON，p95 变慢超过容差时返回 1")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许 p95 变慢的比例")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    for size_name in sizes:
+        if size_name not in SIZES:
+            parser.error(f"未知的分辨率 {size_name}")
+
+    pygame.init()
+    results = {}
+
+    def report(key, stats):
+        results[key] = stats
+        print(f"{key:<32}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+              f"{stats['first_ms']:>10.2f}{stats['alloc_peak_bytes'] / 1024:>12.1f}"
+              f"{stats['surface_allocs']:>8}{stats['surface_alloc_bytes'] / 1024:>14.1f}")
+
+    print(f"每项 {args.frames} 帧，背景条栅方式 {settings.BG_STRIPE_BACKEND}")
+    print(f"{'项目':<30}{'p50(ms)':>9}{'p95(ms)':>9}{'p99(ms)':>9}{'首帧(ms)':>10}{'分配峰值(KB)':>12}"
+          f"{'Surface':>8}{'Surface(KB)':>14}")
+    for size_name in sizes:
+        bench_size(size_name, args.frames, args.alloc_frames, report)
+
+    data = {
+        'meta': {
+            'time': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'frames': args.frames,
+            'stripe_backend': settings.BG_STRIPE_BACKEND,
+        },
+        'results': results,
+    }
+    if os.path.dirname(args.out):
+        os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    print(f"结果已写入 {args.out}")
+    pygame.quit()
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"性能回退 (p95 超过基线 {args.tolerance:.0%})：")
+            for key, old, new in regressions:
+                print(f"  {key:<32}{old:>9.2f} -> {new:.2f}ms")
+            return 1
+        print(f"和基线相比没有超过 {args.tolerance:.0%} 的回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
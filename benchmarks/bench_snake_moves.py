@@ -0,0 +1,117 @@
+# benchmarks/bench_snake_moves.py
+# 贪吃蛇每步移动的开销随蛇长的变化：蛇沿着一条覆盖全场的环走，从很短一直测到几乎铺满整个场地。
+# 同时给出旧的 list 写法 (in 查找 + insert(0)) 作对照。
+# 用法：python -m benchmarks.bench_snake_moves [宽 高 难度 步数]
+import os
+import sys
+import time
+
+# 无窗口运行
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import settings
+from games.snake.game import SnakeGame
+
+
+class _BenchApp:
+    """SnakeGame 只需要 app.difficulty 和 change_scene"""
+    def __init__(self, difficulty):
+        self.difficulty = difficulty
+
+    def change_scene(self, scene_name):
+        pass
+
+
+def hamiltonian_cycle(cols, rows):
+    """覆盖全部格子的环 (相邻两格上下或左右相邻)，返回 (列, 行) 列表；行数和列数至少一个是偶数"""
+    if rows % 2 != 0:
+        return [(c, r) for r, c in hamiltonian_cycle(rows, cols)]
+
+    # 第 0 行从左走到右，其余行在第 1..cols-1 列之间来回走，最后沿第 0 列回到起点
+    cycle = [(c, 0) for c in range(cols)]
+    for r in range(1, rows):
+        columns = range(cols - 1, 0, -1) if r % 2 == 1 else range(1, cols)
+        cycle.extend((c, r) for c in columns)
+    cycle.extend((0, r) for r in range(rows - 1, 0, -1))
+    return cycle
+
+
+def bench_engine(game, cycle, length, moves):
+    """把长度为 length 的蛇摆在环上，沿着环走 moves 步，返回每步平均微秒数"""
+    engine = game.engine
+    cols = engine.cols
+    cells = [r * cols + c for c, r in cycle]
+    n = len(cells)
+
+    def step_dir(a, b):
+        return (cycle[b][0] - cycle[a][0], cycle[b][1] - cycle[a][1])
+
+    # 蛇头在环上的第 length-1 格，身体依次往回排
+    snake = [cells[k] for k in range(length - 1, -1, -1)]
+    dirs = [step_dir((k - 1) % n, k) for k in range(length - 1, -1, -1)]
+    engine.foods.clear()
+    game._place_snake(snake, dirs)
+
+    head_k = length - 1
+    total = 0
+    for _ in range(moves):
+        engine.direction = step_dir(head_k, (head_k + 1) % n)
+        start = time.perf_counter_ns()
+        game.move_snake()
+        total += time.perf_counter_ns() - start
+        head_k = (head_k + 1) % n
+    return total / moves / 1000
+
+
+def bench_legacy_list(cycle, length, moves):
+    """旧写法的核心操作：list 上的 in 查找、insert(0) 和 pop"""
+    n = len(cycle)
+    snake = [cycle[k] for k in range(length - 1, -1, -1)]
+    head_k = length - 1
+    total = 0
+    for _ in range(moves):
+        new_head = cycle[(head_k + 1) % n]
+        start = time.perf_counter_ns()
+        if new_head not in snake:
+            snake.insert(0, new_head)
+            snake.pop()
+        total += time.perf_counter_ns() - start
+        head_k = (head_k + 1) % n
+    return total / moves / 1000
+
+
+def main():
+    args = sys.argv[1:]
+    width = int(args[0]) if len(args) > 0 else 1920
+    height = int(args[1]) if len(args) > 1 else 1080
+    difficulty = args[2] if len(args) > 2 else 'HARD'
+    moves = int(args[3]) if len(args) > 3 else 5000
+
+    pygame.init()
+    pygame.display.set_mode((width, height))
+    settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT = width, height
+
+    game = SnakeGame(_BenchApp(difficulty))
+    cols, rows = game.engine.cols, game.engine.rows
+    if cols % 2 and rows % 2:
+        print(f"场地 {cols}x{rows} 行列都是奇数，没有覆盖全场的环，换个分辨率试试")
+        return
+    cycle = hamiltonian_cycle(cols, rows)
+    board = cols * rows
+
+    print(f"分辨率 {width}x{height}，难度 {difficulty}，场地 {cols}x{rows} = {board} 格，每项 {moves} 步")
+    print(f"{'蛇长':>8}{'占比':>8}{'deque+占用表(us)':>20}{'旧 list(us)':>14}")
+    lengths = sorted({3, board // 10, board // 4, board // 2, board * 3 // 4, board - 1})
+    for length in lengths:
+        if length < 3:
+            continue
+        engine_us = bench_engine(game, cycle, length, moves)
+        legacy_us = bench_legacy_list(cycle, length, moves)
+        print(f"{length:>8}{length / board:>8.0%}{engine_us:>20.2f}{legacy_us:>14.2f}")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_stripes.py
+# 旋转条栅渲染方式对比：transform.rotate vs 角度图集 vs numpy 解析式
+# 用法：python -m benchmarks.bench_stripes [宽 高 帧数]
+import os
+import sys
+import time
+
+# 无窗口运行
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import settings
+from settings import DIFFICULTY_LEVELS
+from core.bg_renderer import BackgroundRenderer
+
+BACKENDS = ["rotate", "atlas", "numpy"]
+
+
+def bench_backend(screen, backend, stripe_width, frames):
+    """返回 (首帧耗时, 平均每帧耗时)，单位毫秒"""
+    settings.BG_STRIPE_BACKEND = backend
+    BackgroundRenderer._pattern_cache.clear()
+    BackgroundRenderer._atlas_cache.clear()
+    BackgroundRenderer._atlas_bytes = 0
+
+    # 首帧包含源图/网格的构建开销，单独统计
+    start = time.perf_counter()
+    BackgroundRenderer.draw(screen, 3, 0, 0, stripe_width)
+    first_ms = (time.perf_counter() - start) * 1000
+
+    # 模拟 60FPS 下连续的时间戳，图集会在一圈内逐步填满
+    start = time.perf_counter()
+    for i in range(frames):
+        BackgroundRenderer.draw(screen, 3, i * 1000 // settings.FPS, 0, stripe_width)
+    avg_ms = (time.perf_counter() - start) * 1000 / frames
+    return first_ms, avg_ms
+
+
+def main():
+    args = sys.argv[1:]
+    width = int(args[0]) if len(args) > 0 else 1920
+    height = int(args[1]) if len(args) > 1 else 1080
+    frames = int(args[2]) if len(args) > 2 else 300
+
+    pygame.init()
+    screen = pygame.display.set_mode((width, height))
+    settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT = width, height
+
+    print(f"分辨率 {width}x{height}，每项 {frames} 帧")
+    print(f"{'难度':<8}{'方式':<8}{'首帧(ms)':>12}{'平均(ms)':>12}")
+    original_backend = settings.BG_STRIPE_BACKEND
+    for diff_key, diff in DIFFICULTY_LEVELS.items():
+        for backend in BACKENDS:
+            first_ms, avg_ms = bench_backend(screen, backend, diff['stripe_width'], frames)
+            print(f"{diff_key:<8}{backend:<8}{first_ms:>12.2f}{avg_ms:>12.2f}")
+    settings.BG_STRIPE_BACKEND = original_backend
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,73 @@
+import importlib
+import threading
 import pygame
-from settings import COLORS
+import settings
+from settings import COLORS, DIFFICULTY_LEVELS
+from core.quality import QualityGovernor
+from core.ui import render_text
+from core.fonts import get_font
+from core.startup import startup_report
+from core.frame_profiler import frame_profiler, CONTENT, HUD
+from core.diagnostics import scene_capture
+
+# 场景注册表：名字 -> (模块, 类名)。第一次切换到这个场景时才导入模块并构造，
+# 这样登录界面出来之前不用加载贪吃蛇的图片
+SCENE_FACTORIES = {
+    'login': ('games.login_scene', 'LoginScene'),
+    'menu': ('games.main_menu', 'MainMenu'),
+    'snake': ('games.snake.game', 'SnakeGame'),
+    # 'eyesight': ('games.eyesight.game', 'EyesightGame'),
+}
+
+
+class SceneWarmUp:
+    """后台线程：构造场景，再按队列顺序为每个难度调用 scene.prepare"""
+
+    def __init__(self, app, scene_name, difficulties):
+        self.app = app
+        self.scene_name = scene_name
+        self._queue = list(difficulties)
+        self._queue_lock = threading.Lock()
+        self.prepared = set()
+        self.done = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def is_ready(self, difficulty):
+        return self.done or difficulty in self.prepared
+
+    def prioritize(self, difficulty):
+        """用户选定了难度：还没准备的话排到队首，下一个就做它"""
+        with self._queue_lock:
+            if difficulty in self._queue:
+                self._queue.remove(difficulty)
+                self._queue.insert(0, difficulty)
+
+    def stop(self):
+        """已经切到这个场景了：做完手上这个难度就停，剩下的难度等真用到时再准备。
+        否则 4K 下其他难度的图案会把正在用的这个从 LRU 缓存里挤掉"""
+        with self._queue_lock:
+            self._queue.clear()
+
+    def _next(self):
+        with self._queue_lock:
+            return self._queue.pop(0) if self._queue else None
+
+    def _run(self):
+        try:
+            scene = self.app.get_scene(self.scene_name)
+            while True:
+                difficulty = self._next()
+                if difficulty is None:
+                    break
+                scene.prepare(difficulty)
+                self.prepared.add(difficulty)
+        except Exception as e:
+            # 预热失败不要紧，切换时会在主线程里同步准备
+            print(f"SceneWarmUp: 预热 {self.scene_name} 失败 {e}")
+        finally:
+            self.done = True
 
-# 引入具体场景
-from games.main_menu import MainMenu
-from games.snake.game import SnakeGame
-from games.login_scene import LoginScene
-# from games.eyesight.game import EyesightGame 
 
 class GameManager:
     def __init__(self):
@@ -15,49 +77,203 @@ class GameManager:
         self.difficulty = 'EASY' 
         
         self.clock = pygame.time.Clock()
-        self.scenes = {} 
+        self.scene_factories = dict(SCENE_FACTORIES)
+        self.scenes = {}  # 已经构造好的场景
+        self._scene_lock = threading.RLock()  # 预热线程也会构造场景
         self.current_scene = None
 
+        # 场景切换推迟到下一帧开始时生效；目标场景还在预热时先显示加载提示
+        self._pending_scene = None
+        self._warm_up = None
+
+        # 固定步长：还没推进的逻辑时间 (毫秒)
+        self._sim_accumulator = 0
+
         self.show_fps = True
-        self.font_fps = pygame.font.SysFont("arial", 20, bold=True)
+        self.font_fps = get_font("arial", 20, bold=True)
+
+        # 自适应画质：帧耗时超预算时降低背景质量
+        self.quality = QualityGovernor() if settings.QUALITY_GOVERNOR else None
+
+        # 脏矩形：切换场景后的第一帧必须整屏刷新
+        self._force_full_frame = True
+        self._last_fps_rect = None
 
     def load_scenes(self):
-        from games.main_menu import MainMenu
-        from games.snake.game import SnakeGame
-        from games.login_scene import LoginScene # 确保导入
-        
-        self.scenes = {
-            'login': LoginScene(self), # 注册登录场景
-            'menu': MainMenu(self),
-            'snake': SnakeGame(self)
-        }
-        
+        """只构造入口的登录界面，其他场景等第一次切换过去时再构造"""
+        self.scenes = {}
         # 【关键修改】入口改为登录界面
-        self.current_scene = self.scenes['login']
+        self.current_scene = self.get_scene('login')
+
+    def get_scene(self, scene_name):
+        """取场景，第一次用到时才构造；没有注册过的名字返回 None"""
+        with self._scene_lock:
+            scene = self.scenes.get(scene_name)
+            if scene is None and scene_name in self.scene_factories:
+                module_name, class_name = self.scene_factories[scene_name]
+                with startup_report.phase(f"scene:{scene_name}"):
+                    module = importlib.import_module(module_name)
+                    scene = getattr(module, class_name)(self)
+                self.scenes[scene_name] = scene
+            return scene
+
+    def warm_up_scene(self, scene_name):
+        """在后台构造场景并准备各难度的资源 (MainMenu 进入选难度界面时调用)，当前难度优先"""
+        if self._warm_up is not None and self._warm_up.scene_name == scene_name and not self._warm_up.done:
+            return
+        difficulties = [self.difficulty] if self.difficulty in DIFFICULTY_LEVELS else []
+        difficulties += [d for d in DIFFICULTY_LEVELS if d not in difficulties]
+        self._warm_up = SceneWarmUp(self, scene_name, difficulties)
 
     def change_scene(self, scene_name):
-        if scene_name in self.scenes:
-            self.current_scene = self.scenes[scene_name]
-            # 如果场景有 reset_game 方法，切换时重置一下（比如贪吃蛇）
-            if hasattr(self.current_scene, 'reset_game'):
-                self.current_scene.reset_game()
-        else:
+        """切换场景：在下一帧开始时 (update 里) 才真正生效"""
+        self._pending_scene = scene_name
+        warm_up = self._warm_up
+        if warm_up is not None and warm_up.scene_name == scene_name and not warm_up.done:
+            # 刚选的难度可能还排在预热队列后面
+            warm_up.prioritize(self.difficulty)
+
+    def _is_scene_ready(self, scene_name):
+        warm_up = self._warm_up
+        if warm_up is None or warm_up.scene_name != scene_name:
+            return True
+        return warm_up.is_ready(self.difficulty)
+
+    def _apply_pending_scene(self):
+        scene_name = self._pending_scene
+        if scene_name is None or not self._is_scene_ready(scene_name):
+            return
+        self._pending_scene = None
+        warm_up = self._warm_up
+        if warm_up is not None and warm_up.scene_name == scene_name:
+            warm_up.stop()
+
+        with self._scene_lock:
+            is_new = scene_name not in self.scenes
+            scene = self.get_scene(scene_name)
+        if scene is None:
             print(f"Error: Scene '{scene_name}' not found.")
+            return
+
+        self.current_scene = scene
+        self._force_full_frame = True
+        self._sim_accumulator = 0
+        # 如果场景有 reset_game 方法，切换时重置一下（比如贪吃蛇）；刚构造的场景本来就是初始状态
+        if not is_new and hasattr(scene, 'reset_game'):
+            scene.reset_game()
+
+    def is_idle(self):
+        """当前场景是否只需要在有输入时重画 (刚切换的场景先画出第一帧)"""
+        if self._force_full_frame or self._pending_scene is not None:
+            return False
+        return self.current_scene is not None and self.current_scene.is_idle()
+
+    def is_loading(self):
+        """正在等预热线程，还不能切换过去"""
+        return self._pending_scene is not None and not self._is_scene_ready(self._pending_scene)
 
     def handle_input(self, event):
+        # 调试热键在所有场景里都能用 (登录和菜单不走 BaseGame 的按键处理)，不交给场景：
+        # F3 开关分阶段帧耗时图，F4 导出 CSV，F5 开始/结束 cProfile + tracemalloc 抓取
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F3:
+                frame_profiler.toggle()
+                # 关掉时脏矩形不会再覆盖柱状图那块区域，整屏刷新一帧把它擦掉
+                self._force_full_frame = True
+                return
+            if event.key == pygame.K_F4:
+                frame_profiler.export_csv()
+                return
+            if event.key == pygame.K_F5:
+                scene_capture.toggle()
+                return
+
+        # 等待切换期间不把输入交给旧场景，免得重复点击
+        if self._pending_scene is not None:
+            return
         if self.current_scene:
             self.current_scene.handle_input(event)
 
     def update(self, dt):
+        # 帧边界：上一帧请求的切换在这里生效
+        self._apply_pending_scene()
+        if scene_capture.active:
+            # 抓取按 场景/难度 分段，期间出现过的背景模式记在报告里
+            scene = self.current_scene
+            scene_capture.relabel((type(scene).__name__, self.difficulty), getattr(scene, 'bg_mode', -1))
+        if self.is_loading():
+            return
+
         if self.current_scene:
+            self.simulate(dt)
+
+    def simulate(self, dt):
+        """推进 dt 毫秒的游戏逻辑：开启固定步长时拆成若干个 SIM_STEP_MS 的步，余数留到下一帧"""
+        if not settings.FIXED_TIMESTEP:
             self.current_scene.update(dt)
+            return
+
+        step = settings.SIM_STEP_MS
+        self._sim_accumulator += dt
+        steps = 0
+        while self._sim_accumulator >= step:
+            if steps >= settings.SIM_MAX_STEPS:
+                # 卡了太久 (比如拖动窗口)：丢掉落下的时间，不然补帧越补越慢
+                self._sim_accumulator = 0
+                break
+            self.current_scene.update(step)
+            self._sim_accumulator -= step
+            steps += 1
 
     def draw(self, surface):
+        """绘制一帧；返回需要刷新的矩形列表，返回 None 表示整屏 flip"""
         if self.current_scene:
-            self.current_scene.draw(surface)
+            scene = self.current_scene
+            frame_profiler.label(type(scene).__name__, self.difficulty, getattr(scene, 'bg_mode', -1))
+            scene.draw(surface)
+            # 自适应画质只管旋转条栅：只记画条栅的帧，而且只记背景这一段 (蛇、HUD、flip 慢了降背景没用)
+            stripe_ms = getattr(scene, 'stripe_ms', None)
+            if self.quality and stripe_ms is not None:
+                self.quality.record(stripe_ms)
+        frame_profiler.lap(CONTENT)
+
+        rects = getattr(self.current_scene, 'dirty_rects', None)
+        if self._force_full_frame:
+            rects = None
+            self._force_full_frame = False
+
+        if self.is_loading():
+            self._draw_loading(surface)
+            rects = None
+
         if self.show_fps:
-            self._draw_fps(surface)
+            fps_rect = self._draw_fps(surface)
+            if rects is not None:
+                # 数字宽度会变，上一帧的框也要刷新
+                rects = rects + [fps_rect]
+                if self._last_fps_rect:
+                    rects.append(self._last_fps_rect)
+            self._last_fps_rect = fps_rect
+
+        if frame_profiler.enabled:
+            # 柱状图位置和大小固定，每帧刷新同一块区域就够了
+            graph_rect = frame_profiler.draw(surface, self.font_fps)
+            if rects is not None:
+                rects = rects + [graph_rect]
+        frame_profiler.lap(HUD)
+        return rects
     
+    def _draw_loading(self, surface):
+        """预热还没做完时画在当前画面上的加载提示，点点随时间变化表示没有卡死"""
+        dots = "." * (pygame.time.get_ticks() // 300 % 4)
+        text_surf = render_text(self.font_fps, f"Loading{dots}", COLORS['white'])
+
+        # 文字长度会变，框按最长的文字固定大小
+        bg_rect = pygame.Rect(0, 0, self.font_fps.size("Loading...")[0] + 40, text_surf.get_height() + 20)
+        bg_rect.center = (surface.get_width() // 2, surface.get_height() // 2)
+        pygame.draw.rect(surface, (0, 0, 0), bg_rect, border_radius=5)
+        surface.blit(text_surf, text_surf.get_rect(midleft=(bg_rect.x + 20, bg_rect.centery)))
+
     def _draw_fps(self, surface):
         # 获取当前帧率
         fps = int(self.clock.get_fps())
@@ -68,7 +284,10 @@ class GameManager:
         else: color = COLORS['red']
         
         fps_text = f"FPS: {fps}"
-        text_surf = self.font_fps.render(fps_text, True, color)
+        if self.quality:
+            # 画质档位也显示出来，降档时一眼就能看到
+            fps_text += f" | BG {self.quality.label}"
+        text_surf = render_text(self.font_fps, fps_text, color)
         
         # 画个黑色背景框，保证看清楚
         bg_rect = text_surf.get_rect(topright=(surface.get_width() - 10, 10))
@@ -76,4 +295,5 @@ class GameManager:
         bg_rect.inflate_ip(10, 10) 
         
         pygame.draw.rect(surface, (0, 0, 0), bg_rect, border_radius=5)
-        surface.blit(text_surf, text_surf.get_rect(center=bg_rect.center))
\ No newline at end of file
+        surface.blit(text_surf, text_surf.get_rect(center=bg_rect.center))
+        return bg_rect
\ No newline at end of file
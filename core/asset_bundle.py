@@ -0,0 +1,186 @@
+# core/asset_bundle.py
+# 资源包：把 assets/images 下的图片和 assets/fonts 下的字体打成一个带索引的文件。
+# 图片存成显示格式 (32 位 BGRA，和 convert_alpha 的结果一致) 的原始像素，
+# 运行时 mmap 整个文件，用 pygame.image.frombuffer 直接建 Surface，不用再解码 PNG。
+# 没有资源包时调用方回退到散装文件。
+# 索引里记着每个源文件打包时的修改时间和大小；散装文件后来被改过的话，包里那一项当作过期，
+# 提示重新打包并回退到散装文件 (散装文件不在时照样用包里的)。
+# 打包命令：python -m core.asset_bundle
+import io
+import os
+import json
+import mmap
+import struct
+import pygame
+import settings
+
+# 文件头：魔数、版本、索引长度；格式变了就加一，旧版本的包会被忽略
+MAGIC = b"PGAB"
+BUNDLE_VERSION = 2
+_HEADER = struct.Struct("<4sII")
+# 每项数据按 16 字节对齐
+_ALIGN = 16
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGE_DIR = os.path.join(BASE_PATH, 'assets', 'images')
+FONT_DIR = os.path.join(BASE_PATH, 'assets', 'fonts')
+
+_bundle = None    # (mmap, 索引)；打开失败时是 False，不再重试
+_stale = set()    # 已经提示过过期的 (种类, 名字)
+
+
+def bundle_path():
+    return os.path.join(BASE_PATH, settings.ASSET_BUNDLE_FILE)
+
+
+def _open():
+    global _bundle
+    if _bundle is None:
+        _bundle = False
+        if not settings.USE_ASSET_BUNDLE:
+            return None
+        try:
+            with open(bundle_path(), "rb") as f:
+                # ACCESS_COPY：只读映射，往 Surface 上画也不会写回文件
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError):
+            return None
+
+        magic, version, index_len = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != BUNDLE_VERSION:
+            print("AssetBundle: 资源包版本不对，改用散装文件 (请重新打包)")
+            mm.close()
+            return None
+        index = json.loads(bytes(mm[_HEADER.size:_HEADER.size + index_len]).decode("utf-8"))
+        _bundle = (mm, index)
+    return _bundle or None
+
+
+def _source_stamp(path):
+    """源文件的 (修改时间 ns, 大小)，用来判断包里的那一项是否过期"""
+    st = os.stat(path)
+    return {'mtime_ns': st.st_mtime_ns, 'src_size': st.st_size}
+
+
+def _entry(kind, name, source_path):
+    """包里的索引项；散装文件在而且和打包时不一样 (改过) 时返回 None，让调用方用散装文件"""
+    bundle = _open()
+    if bundle is None:
+        return None
+    entry = bundle[1][kind].get(name)
+    if entry is None:
+        return None
+    try:
+        stamp = _source_stamp(source_path)
+    except OSError:
+        # 散装文件不在 (比如只发布了资源包)：包里的就是唯一的版本
+        return entry
+    if stamp['mtime_ns'] != entry['mtime_ns'] or stamp['src_size'] != entry['src_size']:
+        if (kind, name) not in _stale:
+            _stale.add((kind, name))
+            print(f"AssetBundle: {os.path.basename(source_path)} 和打包时不一样了，改用散装文件 (请重新打包)")
+        return None
+    return entry
+
+
+def has(kind, name):
+    bundle = _open()
+    return bundle is not None and name in bundle[1][kind]
+
+
+def load_image(name):
+    """从资源包取图片 (名字不带扩展名)，包里没有或已过期时返回 None"""
+    entry = _entry('images', name, os.path.join(IMAGE_DIR, name + ".png"))
+    if entry is None:
+        return None
+    mm = _bundle[0]
+
+    offset, length = entry['offset'], entry['length']
+    surf = pygame.image.frombuffer(memoryview(mm)[offset:offset + length], tuple(entry['size']), "BGRA")
+    # 显示格式不是 ARGB8888 的平台上还是要转换一次
+    display = pygame.display.get_surface()
+    if display and surf.get_masks()[:3] != display.get_masks()[:3]:
+        surf = surf.convert_alpha()
+    return surf
+
+
+def open_font(name):
+    """从资源包取字体文件 (带扩展名)，返回可以交给 pygame.font.Font 的文件对象"""
+    entry = _entry('fonts', name, os.path.join(FONT_DIR, name))
+    if entry is None:
+        return None
+    offset, length = entry['offset'], entry['length']
+    return io.BytesIO(_bundle[0][offset:offset + length])
+
+
+def close():
+    global _bundle
+    _stale.clear()
+    if _bundle:
+        try:
+            _bundle[0].close()
+        except BufferError:
+            # 还有 Surface 在引用这块内存，交给垃圾回收
+            pass
+    _bundle = None
+
+
+def build(path=None):
+    """把散装的图片和字体打成资源包，返回 (图片数, 字体数, 字节数)"""
+    path = path or bundle_path()
+    blobs = []
+    index = {'images': {}, 'fonts': {}}
+
+    for file_name in sorted(os.listdir(IMAGE_DIR)):
+        name, ext = os.path.splitext(file_name)
+        if ext.lower() != ".png":
+            continue
+        # tobytes 自己会做格式转换，打包时不需要窗口
+        source_path = os.path.join(IMAGE_DIR, file_name)
+        surf = pygame.image.load(source_path)
+        if not surf.get_flags() & pygame.SRCALPHA:
+            # 调色板/透明色的图：tobytes 会忽略透明色，先贴到透明底上 (和 convert_alpha 的结果一样)
+            flat = surf
+            surf = pygame.Surface(flat.get_size(), pygame.SRCALPHA, 32)
+            surf.blit(flat, (0, 0))
+        blobs.append((index['images'], name, dict(_source_stamp(source_path), size=list(surf.get_size())),
+                      pygame.image.tobytes(surf, "BGRA")))
+
+    if os.path.isdir(FONT_DIR):
+        for file_name in sorted(os.listdir(FONT_DIR)):
+            if os.path.splitext(file_name)[1].lower() not in (".ttf", ".otf", ".ttc"):
+                continue
+            source_path = os.path.join(FONT_DIR, file_name)
+            with open(source_path, "rb") as f:
+                blobs.append((index['fonts'], file_name, _source_stamp(source_path), f.read()))
+
+    # 先按占位的索引算出数据区起点：索引里的偏移量位数会影响索引长度，所以多算一轮直到稳定
+    data_start = 0
+    while True:
+        offset = data_start
+        for table, name, entry, data in blobs:
+            table[name] = dict(entry, offset=offset, length=len(data))
+            offset += -len(data) % _ALIGN + len(data)
+        index_bytes = json.dumps(index, ensure_ascii=False).encode("utf-8")
+        header_len = _HEADER.size + len(index_bytes)
+        new_start = header_len + (-header_len % _ALIGN)
+        if new_start == data_start:
+            break
+        data_start = new_start
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, BUNDLE_VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        for _, _, _, data in blobs:
+            f.write(b"\0" * (-f.tell() % _ALIGN))
+            f.write(data)
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return len(index['images']), len(index['fonts']), size
+
+
+if __name__ == "__main__":
+    images, fonts, size = build()
+    print(f"AssetBundle: {images} 张图片、{fonts} 个字体 -> {bundle_path()} ({size / 1024:.0f} KB)")
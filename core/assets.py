@@ -0,0 +1,86 @@
+# core/assets.py
+# 图片资源管理：每张图只从磁盘读一次并转换成显示格式，
+# 缩放后的版本按 (名字, 尺寸) 缓存，超过 settings.ASSET_CACHE_SIZE 时按 LRU 淘汰。
+# 有资源包 (core/asset_bundle.py) 时直接从包里映射像素，否则读散装的 PNG。
+import os
+import threading
+from collections import OrderedDict
+import pygame
+import settings
+from core import asset_bundle
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGE_DIR = os.path.join(BASE_PATH, 'assets', 'images')
+
+
+class AssetManager:
+    def __init__(self, image_dir, max_scaled):
+        self.image_dir = image_dir
+        self.max_scaled = max_scaled
+        self._images = {}            # 名字 -> 原图 Surface
+        self._scaled = OrderedDict()  # (名字, 尺寸) -> 缩放后的 Surface
+        # 场景预热线程和主线程都会来取
+        self._lock = threading.RLock()
+        self.loads = 0
+        self.scales = 0
+
+    def path(self, name):
+        return os.path.join(self.image_dir, f"{name}.png")
+
+    def has_image(self, name):
+        with self._lock:
+            return name in self._images or asset_bundle.has('images', name) or os.path.exists(self.path(name))
+
+    def image(self, name, fallback=None):
+        """原图；文件不存在时改用 fallback 那张图，没有 fallback 就抛出 FileNotFoundError"""
+        with self._lock:
+            surf = self._images.get(name)
+            if surf is not None:
+                return surf
+
+            # 资源包里的像素已经是显示格式，不需要解码和转换
+            surf = asset_bundle.load_image(name)
+            if surf is None:
+                path = self.path(name)
+                if not os.path.exists(path):
+                    if fallback is not None:
+                        return self.image(fallback)
+                    raise FileNotFoundError(path)
+
+                surf = pygame.image.load(path)
+                # 没有窗口时 (比如无头跑基准) 不能 convert，保持原格式
+                if pygame.display.get_surface():
+                    surf = surf.convert_alpha()
+            self._images[name] = surf
+            self.loads += 1
+            return surf
+
+    def scaled(self, name, size, fallback=None):
+        """缩放到 size 的版本，同样的 (名字, 尺寸) 只缩放一次"""
+        size = tuple(size)
+        key = (name, size)
+        with self._lock:
+            surf = self._scaled.get(key)
+            if surf is not None:
+                self._scaled.move_to_end(key)
+                return surf
+
+            surf = pygame.transform.scale(self.image(name, fallback), size)
+            self._scaled[key] = surf
+            self.scales += 1
+            while len(self._scaled) > self.max_scaled:
+                self._scaled.popitem(last=False)
+            return surf
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._scaled.clear()
+
+    def stats(self):
+        return {'images': len(self._images), 'scaled': len(self._scaled),
+                'loads': self.loads, 'scales': self.scales}
+
+
+# 全局共用一个
+assets = AssetManager(IMAGE_DIR, settings.ASSET_CACHE_SIZE)
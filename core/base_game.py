@@ -1,15 +1,52 @@
 # core/base_game.py
+import time
 import pygame
+import settings
 from settings import DIFFICULTY_LEVELS
 from core.bg_renderer import BackgroundRenderer
+from core.frame_profiler import frame_profiler, BACKGROUND, CONTENT, HUD
+
+# 后台线程改了界面内容时投递这个事件，唤醒空闲等待中的主循环
+REDRAW_EVENT = pygame.event.custom_type()
 
 class BaseGame:
+    # 静态界面 (登录、菜单) 设为 True：主循环不再固定帧率空转，只在有输入或定时器到期时重画
+    IDLE_RENDERING = False
+
+    # 子类在 draw_content 里用 mark_dirty 报告了所有画过的区域，才能开启脏矩形刷新
+    SUPPORTS_DIRTY_RECTS = False
+
     def __init__(self, app):
         self.app = app
         self.bg_mode = 0
         self.bg_timer = 0
         self.SWITCH_INTERVAL = 5000 # 5秒切换
 
+        # 这一帧画旋转条栅 (模式 3-5) 花的毫秒数，画的是别的背景时为 None (给自适应画质用)
+        self.stripe_ms = None
+
+        # 脏矩形：None 表示这一帧需要整屏刷新
+        self.dirty_rects = None
+        self._frame_rects = []
+        self._prev_rects = []
+        self._last_bg_key = None
+
+        # 常驻 HUD 图层：内容状态不变时每帧只 blit 一次
+        self._hud_layer = None
+        self._hud_state = None
+        self._hud_rect = pygame.Rect(0, 0, 0, 0)
+
+    def is_idle(self):
+        return self.IDLE_RENDERING
+
+    def request_redraw(self):
+        """可以在任意线程调用：让空闲中的主循环马上重画一帧"""
+        try:
+            pygame.event.post(pygame.event.Event(REDRAW_EVENT))
+        except pygame.error:
+            # 显示已经关闭
+            pass
+
     def handle_input(self, event):
         if event.type == pygame.KEYDOWN:
             # 调试用：Tab 手动切
@@ -37,9 +74,71 @@ class BaseGame:
         s_width = settings_data['stripe_width']
         
         current_time = pygame.time.get_ticks()
-        BackgroundRenderer.draw(surface, self.bg_mode, current_time, bg_g_size, s_width)
+        bg_start = time.perf_counter()
+
+        # 开启预渲染时优先用后台线程画好的帧，预测没命中再同步画
+        prerenderer = BackgroundRenderer.get_prerenderer()
+        if prerenderer is None or self.bg_mode in [0, 1, 2]:
+            BackgroundRenderer.draw(surface, self.bg_mode, current_time, bg_g_size, s_width)
+        else:
+            if not prerenderer.present(surface, self.bg_mode, current_time, bg_g_size, s_width):
+                BackgroundRenderer.draw(surface, self.bg_mode, current_time, bg_g_size, s_width)
+            prerenderer.request(self.bg_mode, current_time, bg_g_size, s_width)
+        if self.bg_mode in (3, 4, 5):
+            self.stripe_ms = (time.perf_counter() - bg_start) * 1000
+        else:
+            self.stripe_ms = None
+        frame_profiler.lap(BACKGROUND)
         
+        self._frame_rects = []
         self.draw_content(surface)
+        frame_profiler.lap(CONTENT)
+        self._collect_dirty_rects(surface, diff_key)
 
     def draw_content(self, surface):
-        pass
\ No newline at end of file
+        pass
+
+    def prepare(self, difficulty):
+        """在预热线程里调用：提前准备某个难度要用的资源 (默认只有背景图案)。
+        这里不能改主线程正在用的状态，准备好的东西放进缓存，等 reset_game/draw 来取"""
+        diff = DIFFICULTY_LEVELS[difficulty]
+        BackgroundRenderer.prepare((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT),
+                                   diff['bg_grid_size'], diff['stripe_width'])
+
+    def draw_hud(self, surface, state, compose):
+        """把 HUD 画在常驻的透明图层上。
+        state 是决定 HUD 内容的值 (比如秒数、分数)，和上次不同时才调用 compose(layer) 重新合成；
+        compose 返回它画过的区域，每帧只 blit 这块区域。"""
+        frame_profiler.lap(CONTENT)
+        layer = self._hud_layer
+        if layer is None or layer.get_size() != surface.get_size():
+            layer = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+            if pygame.display.get_surface():
+                layer = layer.convert_alpha()
+            self._hud_layer = layer
+            self._hud_state = None
+
+        if state != self._hud_state:
+            layer.fill((0, 0, 0, 0), self._hud_rect)
+            self._hud_rect = pygame.Rect(compose(layer))
+            self._hud_state = state
+
+        surface.blit(layer, self._hud_rect, self._hud_rect)
+        self.mark_dirty(self._hud_rect)
+        frame_profiler.lap(HUD)
+
+    def mark_dirty(self, rect):
+        """记录这一帧画过的区域 (下一帧还会再刷新一次，用来擦掉旧内容)"""
+        self._frame_rects.append(pygame.Rect(rect))
+
+    def _collect_dirty_rects(self, surface, diff_key):
+        # 只有纯色背景 (0-2) 才能局部刷新；动画背景、切换背景后的第一帧都整屏刷新
+        bg_key = (self.bg_mode, diff_key, surface.get_size())
+        static_bg = self.bg_mode in [0, 1, 2]
+        if settings.DIRTY_RECTS and self.SUPPORTS_DIRTY_RECTS and static_bg and bg_key == self._last_bg_key:
+            self.dirty_rects = self._prev_rects + self._frame_rects
+        else:
+            self.dirty_rects = None
+
+        self._last_bg_key = bg_key if static_bg else None
+        self._prev_rects = self._frame_rects
\ No newline at end of file
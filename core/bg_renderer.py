@@ -1,22 +1,171 @@
 # core/bg_renderer.py
 import pygame
 import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import settings
-from settings import COLORS
+from settings import COLORS, DIFFICULTY_LEVELS
+from core import pattern_store
+
+# numpy 是可选依赖：没有安装时解析式条栅自动退回图集/旋转路径
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class SurfaceCache:
+    """按字节计数的 LRU Surface 缓存，超过上限时淘汰最久没用过的条目。
+    on_evict(surf) 在条目被淘汰、替换或清空时调用 (用来关掉磁盘缓存的映射)"""
+
+    def __init__(self, max_bytes, on_evict=None):
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.on_evict = on_evict
+        self._items = OrderedDict()
+
+    @staticmethod
+    def surface_bytes(surf):
+        return surf.get_pitch() * surf.get_height()
+
+    def get(self, key):
+        surf = self._items.get(key)
+        if surf is not None:
+            self._items.move_to_end(key)
+        return surf
+
+    def put(self, key, surf):
+        if key in self._items:
+            self._evict(self._items.pop(key), keep=surf)
+        self._items[key] = surf
+        self.bytes_used += self.surface_bytes(surf)
+        # 至少保留刚放进去的这一项，否则当前帧就没东西可画
+        while self.bytes_used > self.max_bytes and len(self._items) > 1:
+            _, old = self._items.popitem(last=False)
+            self._evict(old)
+
+    def _evict(self, surf, keep=None):
+        self.bytes_used -= self.surface_bytes(surf)
+        if self.on_evict is not None and surf is not keep:
+            self.on_evict(surf)
+
+    def clear(self):
+        for surf in self._items.values():
+            self._evict(surf)
+        self._items.clear()
+        self.bytes_used = 0
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
 
 class BackgroundRenderer:
-    # 缓存：键 -> Surface
-    _stripe_cache = {}
+    # 图案都只有两种颜色，统一存成 8 位调色板 Surface：
+    # 每种几何形状只存一份，配色和棋盘格相位翻转都靠 set_palette 切换
+    # 缓存：("stripe", 条宽, 尺寸) / ("checker", 格子大小, 尺寸) -> 8 位 Surface
+    # 从磁盘映射来的图案被淘汰时一起解除映射，映射占的内存也受 BG_CACHE_MAX_MB 限制
+    _pattern_cache = SurfaceCache(settings.BG_CACHE_MAX_MB * 1024 * 1024, on_evict=pattern_store.unmap)
     _last_screen_size = (0, 0)
 
+    # 旋转帧图集：(条宽, 尺寸, 步长) -> {帧序号: 屏幕大小的 8 位 Surface}
+    _atlas_cache = {}
+    _atlas_bytes = 0
+    _atlas_overflow_logged = set()  # 已经提示过 "图集放不下一整圈" 的尺寸
+
+    # 解析式条栅：按分辨率预计算的坐标网格和复用的输出缓冲
+    _grid_cache = None
+
+    # 预渲染线程和主线程共用上面这些缓存 (还有共享的调色板)，绘制时必须持锁
+    _lock = threading.RLock()
+    _prerenderer = None
+
+    # 质量档位 (由 QualityGovernor 设置)：条栅的内部渲染比例和旋转步长倍数
+    quality_scale = 1.0
+    quality_step_mult = 1
+    _low_res_buffer = None
+
+    @staticmethod
+    def set_quality(scale, step_mult):
+        with BackgroundRenderer._lock:
+            if step_mult != BackgroundRenderer.quality_step_mult:
+                # 旧步长的帧用不上了，不腾出预算的话新步长一帧也建不起来
+                BackgroundRenderer._drop_atlases()
+            BackgroundRenderer.quality_scale = scale
+            BackgroundRenderer.quality_step_mult = step_mult
+            BackgroundRenderer._low_res_buffer = None
+
     @staticmethod
     def draw(surface, mode_index, current_time, grid_size, stripe_width):
-        # 0. 分辨率变化检测
+        with BackgroundRenderer._lock:
+            BackgroundRenderer._draw_locked(surface, mode_index, current_time, grid_size, stripe_width)
+
+    @staticmethod
+    def frame_key(mode_index, current_time, grid_size, stripe_width):
+        """两个时间戳画出来的背景是否相同 (旋转条栅按量化角度算)"""
+        if mode_index in [3, 4, 5]:
+            step = BackgroundRenderer._atlas_step()
+            angle = (current_time / 50) % 360
+            return (mode_index, stripe_width, int(angle / step))
+        if mode_index in [6, 7, 8]:
+            return (mode_index, grid_size, (current_time // 1000) % 2)
+        return (mode_index,)
+
+    @staticmethod
+    def get_prerenderer():
+        """懒创建后台预渲染线程 (settings.BG_PRERENDER 关闭时返回 None)"""
+        if not settings.BG_PRERENDER:
+            return None
+        if BackgroundRenderer._prerenderer is None:
+            BackgroundRenderer._prerenderer = BackgroundPrerenderer()
+        return BackgroundRenderer._prerenderer
+
+    @staticmethod
+    def prepare(screen_size, grid_size, stripe_width):
+        """提前把某个难度要用的条纹源图和棋盘格放进内存缓存 (场景预热线程调用)。
+        生成图案时不持锁，主线程照常绘制；只有放进缓存时才加锁"""
+        with BackgroundRenderer._lock:
+            BackgroundRenderer._check_screen_size()
+            scale = BackgroundRenderer.quality_scale
+
+        jobs = []
+        if settings.BG_STRIPE_BACKEND != "numpy" or np is None:
+            # 和 _draw_locked 一致：降档时条栅画在低分辨率缓冲里，条宽同比缩小
+            w, h = screen_size
+            size = (max(1, int(w * scale)), max(1, int(h * scale)))
+            width = stripe_width if scale >= 1 else max(1, round(stripe_width * scale))
+            jobs.append((("stripe", width, size), "stripe", width, size))
+        checker = _checker_size(screen_size, grid_size)
+        if checker >= 5:
+            jobs.append((("checker", checker, screen_size), "checker", checker, screen_size))
+
+        for cache_key, kind, param, size in jobs:
+            with BackgroundRenderer._lock:
+                if cache_key in BackgroundRenderer._pattern_cache:
+                    continue
+            surf = BackgroundRenderer._load_or_build(kind, param, size)
+            with BackgroundRenderer._lock:
+                BackgroundRenderer._pattern_cache.put(cache_key, surf)
+
+    @staticmethod
+    def _check_screen_size():
+        """分辨率变了就丢掉所有按旧尺寸生成的缓存"""
         current_size = (settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT)
         if current_size != BackgroundRenderer._last_screen_size:
-            BackgroundRenderer._stripe_cache.clear()
+            BackgroundRenderer._pattern_cache.clear()
+            BackgroundRenderer._atlas_cache.clear()
+            BackgroundRenderer._atlas_bytes = 0
+            BackgroundRenderer._grid_cache = None
+            BackgroundRenderer._low_res_buffer = None
             BackgroundRenderer._last_screen_size = current_size
 
+    @staticmethod
+    def _draw_locked(surface, mode_index, current_time, grid_size, stripe_width):
+        # 0. 分辨率变化检测
+        BackgroundRenderer._check_screen_size()
+
         # --- Group 1: 纯色 (0-2) ---
         if mode_index == 0: surface.fill(COLORS['red'])
         elif mode_index == 1: surface.fill(COLORS['yellow'])
@@ -28,8 +177,23 @@ class BackgroundRenderer:
             c1, c2 = COLORS['black'], COLORS['white']
             if mode_index == 4: c1, c2 = COLORS['red'], COLORS['yellow']
             if mode_index == 5: c1, c2 = COLORS['blue'], COLORS['yellow']
-            
-            BackgroundRenderer._draw_rotating_stripes(surface, angle, c1, c2, stripe_width)
+
+            low_res = None
+            if BackgroundRenderer.quality_scale < 1:
+                low_res = BackgroundRenderer._get_low_res_buffer(surface)
+
+            # 降档时旋转角度也按放大后的步长量化
+            if BackgroundRenderer.quality_step_mult > 1:
+                step = BackgroundRenderer._atlas_step()
+                angle = int(angle / step) * step
+
+            if low_res is not None:
+                # 降档：在低分辨率缓冲里画，再放大到屏幕；条宽同比缩小，放大后空间频率不变
+                low_width = max(1, round(stripe_width * BackgroundRenderer.quality_scale))
+                BackgroundRenderer._draw_rotating_stripes(low_res, angle, c1, c2, low_width)
+                pygame.transform.scale(low_res, surface.get_size(), surface)
+            else:
+                BackgroundRenderer._draw_rotating_stripes(surface, angle, c1, c2, stripe_width)
 
         # --- Group 3: 棋盘格 (6-8) ---
         elif mode_index in [6, 7, 8]:
@@ -43,51 +207,383 @@ class BackgroundRenderer:
             
             BackgroundRenderer._draw_checkerboard(surface, main_c, alt_c, grid_size)
 
+    @staticmethod
+    def _get_low_res_buffer(surface):
+        w, h = surface.get_size()
+        scale = BackgroundRenderer.quality_scale
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        buffer = BackgroundRenderer._low_res_buffer
+        if buffer is None or buffer.get_size() != size:
+            buffer = pygame.Surface(size, 0, surface)
+            BackgroundRenderer._low_res_buffer = buffer
+        return buffer
+
     @staticmethod
     def _draw_rotating_stripes(surface, angle, color1, color2, width):
-        # 1. 缓存键值
-        cache_key = (width, color1, color2)
+        # 所有尺寸都以目标 surface 为准 (降档时它是低分辨率缓冲)
+        size = surface.get_size()
 
-        # 2. 创建缓存 (如果不存在)
-        if cache_key not in BackgroundRenderer._stripe_cache:
-            w, h = settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT
-            diagonal = math.ceil(math.sqrt(w**2 + h**2))
-            size = diagonal + 20 
+        # 0. 解析式路径：直接按公式算出屏幕大小的条栅，不需要对角线大图
+        if settings.BG_STRIPE_BACKEND == "numpy" and np is not None:
+            BackgroundRenderer._draw_analytic_stripes(surface, angle, color1, color2, width)
+            return
 
-            # 创建大图
-            temp_surf = pygame.Surface((size, size))
-            temp_surf.fill(color1)
-            
-            for x in range(0, size, width * 2):
-                pygame.draw.rect(temp_surf, color2, (x + width, 0, width, size))
-            
-            # 【核心优化 1】转换为显示格式！
-            # 这能极大提升后续的 blit 和 rotate 速度 (从 20FPS 提升到 60FPS 的关键)
-            # 注意：如果 convert() 报错，可能是因为 display 还没 init，但在 draw 调用时肯定已经 init 了
-            if pygame.display.get_surface():
-                temp_surf = temp_surf.convert()
+        # 1. 缓存键值 (只跟几何形状有关，颜色由调色板决定)
+        cache_key = ("stripe", width, size)
+
+        # 2. 创建缓存 (如果不存在)：先找磁盘缓存，没有再现场生成
+        source_surf = BackgroundRenderer._pattern_cache.get(cache_key)
+        if source_surf is None:
+            source_surf = BackgroundRenderer._load_or_build("stripe", width, size)
+            BackgroundRenderer._pattern_cache.put(cache_key, source_surf)
 
-            BackgroundRenderer._stripe_cache[cache_key] = temp_surf
+        # 3. 换上本次的配色
+        source_surf.set_palette([color1, color2])
 
-        # 3. 取出源图
-        source_surf = BackgroundRenderer._stripe_cache[cache_key]
+        # 4. 【核心优化 3】角度量化图集：同一个量化角度只旋转一次
+        if settings.BG_STRIPE_BACKEND == "atlas":
+            frame = BackgroundRenderer._get_atlas_frame(size, width, source_surf, angle)
+            if frame is not None:
+                frame.set_palette([color1, color2])
+                surface.blit(frame, (0, 0))
+                return
+            # 图集预算放不下的角度：按同样的量化角度现场画，不为了省内存放大步长 (刺激画面要平滑)
+            step = BackgroundRenderer._atlas_step()
+            angle = int(angle / step) * step
+            if np is not None:
+                BackgroundRenderer._draw_analytic_stripes(surface, angle, color1, color2, width)
+                return
 
-        # 4. 【核心优化 2】回退到 rotate (快速旋转)
+        # 5. 【核心优化 2】回退到 rotate (快速旋转)
         # 放弃 rotozoom，因为在 1080p+ 分辨率下实时插值太慢了
         rotated_surf = pygame.transform.rotate(source_surf, angle)
         
-        # 5. 居中绘制
-        rect = rotated_surf.get_rect(center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2))
+        # 6. 居中绘制
+        rect = rotated_surf.get_rect(center=(size[0] // 2, size[1] // 2))
         surface.blit(rotated_surf, rect)
 
+    @staticmethod
+    def _get_grid(size):
+        """按分辨率准备坐标网格和输出缓冲 (每个分辨率只分配一次)"""
+        w, h = size
+        grid = BackgroundRenderer._grid_cache
+        if grid is None or grid['size'] != (w, h):
+            # 与旋转路径保持同一相位：源图宽度的一半作为原点偏移，
+            # 这样投影值始终为正，截断取整就等于向下取整
+            diagonal = math.ceil(math.sqrt(w**2 + h**2))
+            # 缓冲按 (y, x) 连续排列，blit 时再转置成 surfarray 的 (x, y)
+            grid = {
+                'size': (w, h),
+                'xs': np.arange(w, dtype=np.float32) - w / 2,
+                'ys': np.arange(h, dtype=np.float32) - h / 2,
+                'offset': (diagonal + 20) / 2,
+                'x_buf': np.empty(w, dtype=np.float32),
+                'y_buf': np.empty(h, dtype=np.float32),
+                'proj': np.empty((h, w), dtype=np.float32),
+                'pixels': np.empty((h, w), dtype=np.uint32),
+            }
+            BackgroundRenderer._grid_cache = grid
+        return grid
+
+    @staticmethod
+    def _draw_analytic_stripes(surface, angle, color1, color2, width):
+        """((x·cosθ + y·sinθ) // width) % 2，全部写进预分配的缓冲，热循环不分配内存"""
+        grid = BackgroundRenderer._get_grid(surface.get_size())
+        # transform.rotate 是逆时针，屏幕坐标 y 向下，所以 y 项取反
+        theta = math.radians(angle)
+        cos_t, sin_t = math.cos(theta), math.sin(theta)
+
+        # 先把 1/width 乘进一维坐标，二维数组上只剩一次加法
+        x_buf, y_buf, proj = grid['x_buf'], grid['y_buf'], grid['proj']
+        np.multiply(grid['xs'], cos_t / width, out=x_buf)
+        np.multiply(grid['ys'], -sin_t / width, out=y_buf)
+        x_buf += grid['offset'] / width
+        np.add(y_buf[:, None], x_buf[None, :], out=proj)
+
+        # 取整后的奇偶位选颜色：pixel = (bit * (c1 ^ c2)) ^ c1
+        pixels = grid['pixels']
+        np.copyto(pixels, proj, casting='unsafe')
+        np.bitwise_and(pixels, 1, out=pixels)
+        mapped1 = surface.map_rgb(color1)
+        mapped2 = surface.map_rgb(color2)
+        np.multiply(pixels, np.uint32(mapped1 ^ mapped2), out=pixels)
+        np.bitwise_xor(pixels, np.uint32(mapped1), out=pixels)
+        pygame.surfarray.blit_array(surface, pixels.T)
+
+    @staticmethod
+    def _stripe_size():
+        """旋转条栅实际渲染的尺寸 (降档时是低分辨率缓冲的尺寸)"""
+        scale = BackgroundRenderer.quality_scale
+        return (max(1, int(settings.SCREEN_WIDTH * scale)), max(1, int(settings.SCREEN_HEIGHT * scale)))
+
+    @staticmethod
+    def _atlas_step():
+        """实际使用的量化步长：帧数超过上限时自动放大步长，降档时再乘以倍数"""
+        step = max(0.01, settings.BG_ROTATION_STEP)
+        max_frames = max(1, settings.BG_ATLAS_MAX_FRAMES)
+        return max(step, 360 / max_frames) * BackgroundRenderer.quality_step_mult
+
+    @staticmethod
+    def atlas_coverage():
+        """图集模式下 (预算能缓存的帧数, 一整圈的帧数)，其他模式返回 None。
+        前者小于后者时，放不下的角度每帧现场计算 (画质显示和日志里会带上这个比例)"""
+        if settings.BG_STRIPE_BACKEND != "atlas":
+            return None
+        w, h = BackgroundRenderer._stripe_size()
+        needed = max(1, int(round(360 / BackgroundRenderer._atlas_step())))
+        # 图集帧是 8 位的，每像素一个字节
+        fit = settings.BG_ATLAS_MAX_MB * 1024 * 1024 // (w * h)
+        return min(fit, needed), needed
+
+    @staticmethod
+    def _get_atlas_frame(size, width, source_surf, angle):
+        """取出 (或懒构建) 量化角度对应的帧，内存超限时返回 None"""
+        step = BackgroundRenderer._atlas_step()
+        frame_count = max(1, int(round(360 / step)))
+        index = int(angle / step) % frame_count
+
+        key = (width, size, step)
+        frames = BackgroundRenderer._atlas_cache.setdefault(key, {})
+        frame = frames.get(index)
+        if frame is not None:
+            return frame
+
+        w, h = size
+        frame_bytes = w * h * source_surf.get_bytesize()
+        budget = settings.BG_ATLAS_MAX_MB * 1024 * 1024
+        if BackgroundRenderer._atlas_bytes + frame_bytes > budget:
+            # 预算被别的图集 (换了难度或画质) 占着时先把它们腾掉
+            BackgroundRenderer._drop_atlases(keep=key)
+            if BackgroundRenderer._atlas_bytes + frame_bytes > budget:
+                if size not in BackgroundRenderer._atlas_overflow_logged:
+                    BackgroundRenderer._atlas_overflow_logged.add(size)
+                    backend = "numpy" if np is not None else "rotate"
+                    print(f"BackgroundRenderer: {w}x{h} 下图集预算只够 {len(frames)}/{frame_count} 帧，"
+                          f"其余角度每帧用 {backend} 现场计算")
+                return None
+
+        # 旋转后裁剪到屏幕大小，不保留对角线尺寸的大图 (仍是 8 位调色板)
+        rotated_surf = pygame.transform.rotate(source_surf, index * step)
+        crop = pygame.Rect(0, 0, w, h)
+        crop.center = rotated_surf.get_rect().center
+        frame = rotated_surf.subsurface(crop).copy()
+
+        frames[index] = frame
+        BackgroundRenderer._atlas_bytes += frame_bytes
+        return frame
+
+    @staticmethod
+    def _drop_atlases(keep=None):
+        """丢掉除 keep 以外的所有图集"""
+        for key in list(BackgroundRenderer._atlas_cache):
+            if key == keep:
+                continue
+            for frame in BackgroundRenderer._atlas_cache.pop(key).values():
+                BackgroundRenderer._atlas_bytes -= frame.get_width() * frame.get_height() * frame.get_bytesize()
+
     @staticmethod
     def _draw_checkerboard(surface, bg_color, fill_color, size):
-        # 保持之前的逻辑...
-        safe_size = max(1, min(size, settings.SCREEN_WIDTH - 1, settings.SCREEN_HEIGHT - 1))
+        screen_size = surface.get_size()
+        safe_size = _checker_size(screen_size, size)
         if safe_size < 5: return 
 
-        surface.fill(bg_color)
-        for y in range(0, settings.SCREEN_HEIGHT, safe_size):
-            for x in range(0, settings.SCREEN_WIDTH, safe_size):
-                if ((y // safe_size) + (x // safe_size)) % 2 == 1:
-                    pygame.draw.rect(surface, fill_color, (x, y, safe_size, safe_size))
\ No newline at end of file
+        # 每种格子大小只存一张 8 位图，相位翻转就是把调色板两种颜色对调
+        cache_key = ("checker", safe_size, screen_size)
+        board = BackgroundRenderer._pattern_cache.get(cache_key)
+        if board is None:
+            board = BackgroundRenderer._load_or_build("checker", safe_size, screen_size)
+            BackgroundRenderer._pattern_cache.put(cache_key, board)
+
+        board.set_palette([bg_color, fill_color])
+        surface.blit(board, (0, 0))
+
+    @staticmethod
+    def _load_or_build(kind, param, screen_size):
+        """从磁盘缓存映射图案；缓存缺失时现场生成并写回磁盘"""
+        surf_size = pattern_size(kind, screen_size)
+
+        surf = pattern_store.load(kind, screen_size, param, surf_size)
+        if surf is None:
+            surf = build_pattern(kind, screen_size, param)
+            pattern_store.save(kind, screen_size, param, surf)
+        return surf
+
+    @staticmethod
+    def _build_stripe_source(screen_size, width):
+        """对角线大小的竖条纹源图：0 号色是 color1，1 号色是 color2"""
+        w, h = screen_size
+        diagonal = math.ceil(math.sqrt(w**2 + h**2))
+        size = diagonal + 20 
+
+        # 【核心优化 1】8 位调色板，不再 convert() 成 32 位，内存只有原来的 1/4
+        source_surf = pygame.Surface((size, size), 0, 8)
+        source_surf.fill(0)
+        
+        for x in range(0, size, width * 2):
+            source_surf.fill(1, (x + width, 0, width, size))
+        return source_surf
+
+    @staticmethod
+    def _build_checkerboard(screen_size, size):
+        """用 2x2 格子的小图平铺出整屏棋盘格：0 号色是底色，1 号色是填充色"""
+        w, h = screen_size
+
+        tile = pygame.Surface((size * 2, size * 2), 0, 8)
+        tile.fill(0)
+        tile.fill(1, (size, 0, size, size))
+        tile.fill(1, (0, size, size, size))
+
+        # 8 位之间的 blit 要求调色板一致才是原样拷贝索引
+        board = pygame.Surface((w, h), 0, 8)
+        board.set_palette(tile.get_palette())
+        for y in range(0, h, size * 2):
+            for x in range(0, w, size * 2):
+                board.blit(tile, (x, y))
+        return board
+
+
+class BackgroundPrerenderer:
+    """后台线程：按预测的下一帧时间戳把背景画进两块后备缓冲之一。
+
+    主线程 present() 时如果预测命中，直接 blit 画好的缓冲；没命中就返回 False，
+    由调用方同步绘制。pygame 的 fill/blit/transform 会释放 GIL，多核下能真正并行。
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._buffers = []
+        self._front = 0
+        self._pending = None     # (参数, 帧键)
+        self._ready = None       # (缓冲序号, 帧键)
+        self._last_time = None
+        self.hits = 0
+        self.misses = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def present(self, surface, mode_index, current_time, grid_size, stripe_width):
+        """预测命中就把后备缓冲 blit 到 surface 上并返回 True"""
+        key = BackgroundRenderer.frame_key(mode_index, current_time, grid_size, stripe_width)
+        with self._cond:
+            self._ensure_buffers(surface)
+            if self._ready is None or self._ready[1] != key:
+                self.misses += 1
+                return False
+            # 交换前后缓冲：之后后台线程只会写另一块
+            self._front = self._ready[0]
+            self._ready = None
+            self.hits += 1
+        surface.blit(self._buffers[self._front], (0, 0))
+        return True
+
+    def request(self, mode_index, current_time, grid_size, stripe_width):
+        """根据上一帧的间隔预测下一帧的时间戳，交给后台线程去画"""
+        frame_dt = 1000 / settings.FPS
+        if self._last_time is not None and current_time > self._last_time:
+            frame_dt = current_time - self._last_time
+        self._last_time = current_time
+
+        next_time = int(current_time + frame_dt)
+        args = (mode_index, next_time, grid_size, stripe_width)
+        key = BackgroundRenderer.frame_key(*args)
+        with self._cond:
+            if self._ready is not None and self._ready[1] == key:
+                return
+            self._pending = (args, key)
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def _ensure_buffers(self, surface):
+        size = surface.get_size()
+        if self._buffers and self._buffers[0].get_size() == size:
+            return
+        # 分辨率变了：丢掉旧缓冲和已经画好的帧
+        self._buffers = [pygame.Surface(size, 0, surface) for _ in range(2)]
+        self._ready = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and (self._pending is None or not self._buffers):
+                    self._cond.wait()
+                if not self._running:
+                    return
+                args, key = self._pending
+                self._pending = None
+                # 开画之前作废旧的成品，保证主线程不会读到正在写的缓冲
+                self._ready = None
+                index = 1 - self._front
+                target = self._buffers[index]
+
+            BackgroundRenderer.draw(target, *args)
+
+            with self._cond:
+                if target is self._buffers[index] and self._pending is None:
+                    self._ready = (index, key)
+
+
+def pattern_size(kind, screen_size):
+    """图案 Surface 的尺寸：条纹源图是对角线大小的正方形，棋盘格与屏幕一样大"""
+    w, h = screen_size
+    if kind == "stripe":
+        size = math.ceil(math.sqrt(w**2 + h**2)) + 20
+        return (size, size)
+    return (w, h)
+
+
+def build_pattern(kind, screen_size, param):
+    if kind == "stripe":
+        return BackgroundRenderer._build_stripe_source(screen_size, param)
+    return BackgroundRenderer._build_checkerboard(screen_size, param)
+
+
+def _checker_size(screen_size, grid_size):
+    w, h = screen_size
+    return max(1, min(grid_size, w - 1, h - 1))
+
+
+def _warm_job(job):
+    """进程池里跑的任务：生成一张图案并写入磁盘 (8 位 Surface 不需要显示窗口)"""
+    kind, screen_size, param = job
+    pattern_store.save(kind, screen_size, param, build_pattern(kind, screen_size, param))
+    return job
+
+
+def warm_up_disk_cache(screen_size, workers=None):
+    """用进程池并行生成所有难度的条纹源图和棋盘格，已经存在的跳过；返回新生成的数量"""
+    jobs = set()
+    for diff in DIFFICULTY_LEVELS.values():
+        jobs.add(("stripe", screen_size, diff['stripe_width']))
+        checker = _checker_size(screen_size, diff['bg_grid_size'])
+        if checker >= 5:
+            jobs.add(("checker", screen_size, checker))
+
+    jobs = [job for job in sorted(jobs) if not pattern_store.exists(*job)]
+    if not jobs:
+        return 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for kind, _, param in pool.map(_warm_job, jobs):
+            print(f"BackgroundRenderer: 已缓存 {kind} {param}")
+    return len(jobs)
+
+
+def start_disk_cache_warm_up(screen_size):
+    """首次运行时在后台线程里预热磁盘缓存，不阻塞登录界面"""
+    if not settings.BG_DISK_CACHE:
+        return None
+
+    def _run():
+        try:
+            warm_up_disk_cache(screen_size)
+        except Exception as e:
+            print(f"BackgroundRenderer: 预热磁盘缓存失败 {e}")
+
+    thread = threading.Thread(target=_run, daemon=True)
+    thread.start()
+    return thread
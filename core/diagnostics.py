@@ -0,0 +1,117 @@
+# core/diagnostics.py
+# 按需抓取 cProfile 和 tracemalloc 数据：F5 (或启动参数 --profile) 开始/结束。
+# 抓取按 (场景, 难度) 分段：换了场景或难度就把上一段写盘、开始新的一段。
+# 背景模式每 5 秒自动轮换，不拿它分段 (否则几秒就切出一对文件)，而是把这一段里出现过的模式
+# 按顺序记进文件名和报告。每段写两个文件到 diagnostics_dir() (项目目录下的 settings.DIAGNOSTICS_DIR)：
+#   时间_场景_难度_bg模式.pstats      用 python -m pstats 或 snakeviz 打开 (模式有多个时写成 bg3-4-5)
+#   时间_场景_难度_bg模式_alloc.txt   分配最多的代码行
+# 没开启时只有 GameManager.update 里的一次属性判断。
+import os
+import time
+import cProfile
+import tracemalloc
+import settings
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def diagnostics_dir():
+    """导出性能数据的目录：相对路径按项目目录算，不随启动时的工作目录变"""
+    return os.path.join(BASE_PATH, settings.DIAGNOSTICS_DIR)
+
+
+class SceneCapture:
+    def __init__(self):
+        self.active = False
+        self.label = None  # (场景, 难度)，第一次 relabel 时确定
+        self.bg_modes = []  # 这一段里出现过的背景模式 (按出现顺序)
+        self._profile = None
+        self._started = 0.0
+        self._own_tracemalloc = False
+
+    def toggle(self):
+        if self.active:
+            self.stop()
+        else:
+            self.start()
+
+    def start(self, label=None):
+        if self.active:
+            return
+        self._profile = cProfile.Profile()
+        try:
+            self._profile.enable()
+        except ValueError as e:
+            # 已经有别的 profiler 在跑 (比如整个进程是用 python -m cProfile 启动的)
+            print(f"SceneCapture: 无法开始 {e}")
+            self._profile = None
+            return
+        # 外面已经开着 tracemalloc 时不去动它
+        self._own_tracemalloc = not tracemalloc.is_tracing()
+        if self._own_tracemalloc:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self.label = label
+        self.bg_modes = []
+        self._started = time.perf_counter()
+        self.active = True
+        print("SceneCapture: 开始抓取")
+
+    def relabel(self, label, bg_mode):
+        """每帧调用：场景或难度变了就结束当前这一段，用新标签重新开始；背景模式只记录"""
+        if self.label is None:
+            self.label = label
+        elif label != self.label:
+            self.stop()
+            self.start(label)
+            if not self.active:
+                return
+        if bg_mode not in self.bg_modes:
+            self.bg_modes.append(bg_mode)
+
+    def stop(self):
+        """结束抓取并写盘，返回写出的文件路径列表"""
+        if not self.active:
+            return []
+        self._profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+        self.active = False
+        duration = time.perf_counter() - self._started
+
+        scene, difficulty = self.label or ("unknown", "-")
+        bg_modes = "-".join(str(mode) for mode in self.bg_modes) or "none"
+        os.makedirs(diagnostics_dir(), exist_ok=True)
+        base = os.path.join(diagnostics_dir(),
+                            f"{time.strftime('%Y%m%d_%H%M%S')}_{scene}_{difficulty}_bg{bg_modes}")
+
+        stats_path = base + ".pstats"
+        self._profile.dump_stats(stats_path)
+        self._profile = None
+
+        alloc_path = base + "_alloc.txt"
+        self._write_alloc_report(alloc_path, snapshot, duration, current, peak)
+        print(f"SceneCapture: {duration:.1f}s 写入 {stats_path}")
+        return [stats_path, alloc_path]
+
+    def _write_alloc_report(self, path, snapshot, duration, current, peak):
+        # 抓取工具自己的分配不算
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        stats = snapshot.statistics('lineno')
+        scene, difficulty = self.label or ("unknown", "-")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"scene: {scene}  difficulty: {difficulty}  bg_modes: {self.bg_modes}\n")
+            f.write(f"duration: {duration:.1f}s  traced now: {current / 1024:.1f}KB  peak: {peak / 1024:.1f}KB\n\n")
+            f.write(f"Top {settings.CAPTURE_TOP_ALLOCATIONS} allocations (by line):\n")
+            for stat in stats[:settings.CAPTURE_TOP_ALLOCATIONS]:
+                frame = stat.traceback[0]
+                f.write(f"{stat.size / 1024:>10.1f}KB {stat.count:>8} blocks  {frame.filename}:{frame.lineno}\n")
+
+
+scene_capture = SceneCapture()
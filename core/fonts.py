@@ -0,0 +1,127 @@
+# core/fonts.py
+# 字体注册表：SysFont 每次都要扫描系统字体目录 (Linux 上还要跑 fc-list)，很慢。
+# 这里把 "字体名 -> 文件路径" 只解析一次并存到磁盘，Font 对象按 (路径, 字号, 粗体) 复用。
+# 系统里没有这个字体时依次回退到：系统里常见的中文字体 (CJK_SYSTEM_FONTS)
+# -> 自带字体文件 (settings.FONT_FALLBACK_FILE，散装文件或资源包里的同名字体) -> pygame 默认字体。
+import os
+import json
+import threading
+import pygame
+import settings
+from core import asset_bundle
+
+# 解析规则变了就加一，旧的缓存文件会被忽略
+CACHE_VERSION = 2
+
+# 找不到请求的字体时按顺序试这些系统字体 (Linux 发行版常带的中文字体)，都没有再用自带字体
+CJK_SYSTEM_FONTS = "notosanscjksc,notosanssc,sourcehansanssc,wenquanyimicrohei,wenquanyizenhei,droidsansfallback"
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (字体名, 粗体) -> {'path': 文件路径或 None, 'fake_bold': 是否需要 set_bold 模拟粗体}
+_resolved = None
+# (路径, 字号, 粗体) -> Font
+_fonts = {}
+# 场景预热线程也会解析字体、创建 Font，解析结果和 _fonts 的读写、存盘都要持锁
+_lock = threading.Lock()
+
+
+def _cache_path():
+    return os.path.join(BASE_PATH, settings.FONT_CACHE_FILE)
+
+
+def _fallback_path():
+    path = os.path.join(BASE_PATH, settings.FONT_FALLBACK_FILE)
+    return path if os.path.exists(path) else None
+
+
+def _load_resolved():
+    """读磁盘上的解析结果；文件已经不存在的条目丢掉，下次用到时重新解析"""
+    global _resolved
+    _resolved = {}
+    try:
+        with open(_cache_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    if data.get('version') != CACHE_VERSION:
+        return
+
+    fallback = _fallback_path()
+    for entry in data.get('fonts', []):
+        path = entry.get('path')
+        if path is not None and not os.path.exists(path):
+            continue
+        # 上次什么都没找到，但现在放了自带字体
+        if path is None and fallback is not None:
+            continue
+        _resolved[(entry['family'], entry['bold'])] = {'path': path, 'fake_bold': entry['fake_bold']}
+
+
+def _save_resolved():
+    """持锁调用"""
+    fonts = [{'family': family, 'bold': bold, **info} for (family, bold), info in _resolved.items()]
+    path = _cache_path()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({'version': CACHE_VERSION, 'fonts': fonts}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Fonts: 写入字体缓存失败 {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def resolve(family, bold=False):
+    """字体名 (可以是逗号分隔的多个候选) -> 解析结果，和 SysFont 的查找规则一致"""
+    with _lock:
+        if _resolved is None:
+            _load_resolved()
+
+        key = (family, bold)
+        info = _resolved.get(key)
+        if info is None:
+            info = _match(family, bold) or _match(CJK_SYSTEM_FONTS, bold)
+            if info is None:
+                # 系统里没有：用自带字体，它只有常规体，粗体靠 set_bold 模拟
+                info = {'path': _fallback_path(), 'fake_bold': bold}
+            _resolved[key] = info
+            _save_resolved()
+        return info
+
+
+def _match(family, bold):
+    """在系统字体里找，找不到返回 None"""
+    path = pygame.font.match_font(family, bold)
+    if path is None:
+        return None
+    # 没有单独的粗体文件时 match_font 会退回常规体
+    return {'path': path, 'fake_bold': bold and path == pygame.font.match_font(family, False)}
+
+
+def get_font(family, size, bold=False):
+    """代替 pygame.font.SysFont：同样的参数只创建一次 Font"""
+    info = resolve(family, bold)
+    key = (info['path'], size, bold)
+    with _lock:
+        font = _fonts.get(key)
+        if font is None:
+            source = info['path']
+            if source is None:
+                # 散装的自带字体不在，再看看资源包里有没有
+                source = asset_bundle.open_font(os.path.basename(settings.FONT_FALLBACK_FILE))
+            font = pygame.font.Font(source, size)
+            if info['fake_bold']:
+                font.set_bold(True)
+            _fonts[key] = font
+        return font
+
+
+def clear():
+    """丢掉内存里的 Font 和解析结果 (pygame.font.quit 之后旧的 Font 不能再用)"""
+    global _resolved
+    with _lock:
+        _fonts.clear()
+        _resolved = None
@@ -0,0 +1,176 @@
+# core/frame_profiler.py
+# 分阶段的帧耗时记录：每帧记下 事件处理、update、背景、场景内容、HUD/叠加层、flip 各花了多少毫秒，
+# 连同当时的场景、难度和背景模式存进固定大小的环形缓冲区 (array，不会每帧分配对象)。
+# F3 开关 (开启时左下角画最近几秒的堆叠柱状图)，F4 把缓冲区导出成 CSV (热键在 GameManager.handle_input 里)，用来对照卡顿出在哪个背景/场景。
+# 关闭时每个打点只是一次属性判断。
+import os
+import csv
+import time
+from array import array
+import pygame
+import settings
+from settings import COLORS
+from core.ui import render_text
+from core.diagnostics import diagnostics_dir
+
+PHASES = ("events", "update", "background", "content", "hud", "flip")
+EVENTS, UPDATE, BACKGROUND, CONTENT, HUD, FLIP = range(len(PHASES))
+PHASE_COLORS = [
+    (120, 120, 255),  # events
+    (80, 200, 120),   # update
+    (230, 160, 40),   # background
+    (220, 80, 80),    # content
+    (200, 200, 200),  # hud
+    (170, 90, 220),   # flip
+]
+
+
+class FrameProfiler:
+    GRAPH_FRAMES = 120   # 柱状图显示最近多少帧
+    BAR_WIDTH = 3
+    GRAPH_HEIGHT = 120   # 两个帧预算 (2 * 1000/FPS) 对应的像素高度
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.enabled = False
+        n = len(PHASES)
+        # 第 i 帧的各阶段耗时在 _times[i*n : i*n+n]
+        self._times = array('f', [0.0]) * (capacity * n)
+        self._stamps = array('d', [0.0]) * capacity  # 帧开始时刻 (开启后的毫秒数)
+        self._labels = array('H', [0]) * capacity    # 下标指向 _label_names
+        self._label_names = []  # [(场景, 难度, 背景模式)]
+        self._label_index = {}
+        self._current = array('f', [0.0]) * n
+        self.count = 0  # 开启以来记录的总帧数 (写入位置 = count % capacity)
+        self._in_frame = False
+        self._start = 0.0
+        self._frame_start = 0.0
+        self._last = 0.0
+        self._label = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self._in_frame = False
+        if self.enabled:
+            self.clear()
+        print(f"FrameProfiler: {'开启' if self.enabled else '关闭'}")
+
+    def clear(self):
+        self.count = 0
+        self._label_names = []
+        self._label_index = {}
+        self._start = time.perf_counter()
+
+    def begin_frame(self):
+        """主循环拿到这一帧的事件之后调用 (等待输入和 tick 的时间不算)"""
+        if not self.enabled:
+            return
+        self._frame_start = self._last = time.perf_counter()
+        for i in range(len(self._current)):
+            self._current[i] = 0.0
+        self._in_frame = True
+
+    def lap(self, phase):
+        """从上一个打点到现在的时间记到 phase 上"""
+        if not self._in_frame:
+            return
+        now = time.perf_counter()
+        self._current[phase] += (now - self._last) * 1000
+        self._last = now
+
+    def label(self, scene, difficulty, bg_mode):
+        """记下这一帧画的是什么"""
+        if not self._in_frame:
+            return
+        key = (scene, difficulty, bg_mode)
+        index = self._label_index.get(key)
+        if index is None:
+            index = self._label_index[key] = len(self._label_names)
+            self._label_names.append(key)
+        self._label = index
+
+    def end_frame(self):
+        """flip 之后调用，把这一帧写进环形缓冲区"""
+        if not self._in_frame:
+            return
+        self._in_frame = False
+        n = len(PHASES)
+        slot = self.count % self.capacity
+        self._times[slot * n:slot * n + n] = self._current
+        self._stamps[slot] = (self._frame_start - self._start) * 1000
+        self._labels[slot] = self._label
+        self.count += 1
+
+    def _slots(self, last=None):
+        """从旧到新的缓冲区下标，last 只取最近几帧"""
+        size = min(self.count, self.capacity)
+        if last is not None:
+            size = min(size, last)
+        first = self.count - size
+        return [i % self.capacity for i in range(first, self.count)]
+
+    def export_csv(self, path=None):
+        """把缓冲区里的帧写成 CSV，返回文件路径"""
+        if path is None:
+            name = time.strftime("frames_%Y%m%d_%H%M%S.csv")
+            path = os.path.join(diagnostics_dir(), name)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        n = len(PHASES)
+        frame = self.count - min(self.count, self.capacity)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "time_ms", "scene", "difficulty", "bg_mode"]
+                            + [f"{p}_ms" for p in PHASES] + ["total_ms"])
+            for slot in self._slots():
+                scene, difficulty, bg_mode = self._label_names[self._labels[slot]]
+                times = self._times[slot * n:slot * n + n]
+                writer.writerow([frame, f"{self._stamps[slot]:.1f}", scene, difficulty, bg_mode]
+                                + [f"{t:.3f}" for t in times] + [f"{sum(times):.3f}"])
+                frame += 1
+        print(f"FrameProfiler: 导出 {min(self.count, self.capacity)} 帧到 {path}")
+        return path
+
+    def draw(self, surface, font):
+        """左下角画最近 GRAPH_FRAMES 帧的堆叠柱状图，返回画过的区域"""
+        n = len(PHASES)
+        budget = 1000 / settings.FPS
+        scale = self.GRAPH_HEIGHT / (budget * 2)
+        # 图例只有阶段名 (文字不变，走文字缓存)
+        legend = [render_text(font, name, PHASE_COLORS[phase]) for phase, name in enumerate(PHASES)]
+        legend_w = sum(text.get_width() for text in legend) + 10 * (len(legend) - 1)
+        legend_h = font.get_linesize()
+        width = self.GRAPH_FRAMES * self.BAR_WIDTH
+        rect = pygame.Rect(10, surface.get_height() - self.GRAPH_HEIGHT - legend_h - 20,
+                           max(width, legend_w) + 10, self.GRAPH_HEIGHT + legend_h + 15)
+        pygame.draw.rect(surface, (0, 0, 0), rect)
+        x = rect.x + 5
+        for text in legend:
+            surface.blit(text, (x, rect.y + 5))
+            x += text.get_width() + 10
+
+        # 柱子从下往上按阶段堆叠，超出两个预算的截掉
+        slots = self._slots(self.GRAPH_FRAMES)
+        bottom = rect.bottom - 5
+        x = rect.x + 5 + (self.GRAPH_FRAMES - len(slots)) * self.BAR_WIDTH
+        for slot in slots:
+            y = bottom
+            for phase in range(n):
+                h = int(self._times[slot * n + phase] * scale)
+                if h <= 0:
+                    continue
+                h = min(h, y - (bottom - self.GRAPH_HEIGHT))
+                if h <= 0:
+                    break
+                y -= h
+                surface.fill(PHASE_COLORS[phase], (x, y, self.BAR_WIDTH - 1, h))
+            x += self.BAR_WIDTH
+
+        # 一帧预算的参考线
+        budget_y = bottom - int(budget * scale)
+        pygame.draw.line(surface, COLORS['yellow'], (rect.x + 5, budget_y), (rect.x + 5 + width, budget_y))
+        return rect
+
+
+frame_profiler = FrameProfiler(settings.PROFILER_FRAMES)
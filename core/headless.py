@@ -0,0 +1,135 @@
+# core/headless.py
+# 无头模式：用 SDL 的 dummy 显示驱动，不等时钟，按固定步长把一整局 (默认 TRAINING_DURATION) 尽快跑完。
+# 输入来自脚本，画面可以不画。用于自动化测试和调参。
+# 用法：python main.py --headless [--scene snake] [--difficulty HARD] [--script 输入.txt] [--render] [--duration 秒] [--seed 种子] [--profile]
+# 输入脚本每行一条 "毫秒 按键"，例如 "1500 up"；按键名同 pygame.key.key_code，# 开头的行是注释。
+import os
+import sys
+import time
+import random
+import argparse
+import pygame
+import settings
+
+
+def use_dummy_drivers():
+    """不开窗口、不出声音；必须在任何 pygame 初始化之前调用，SDL 初始化时就选定了驱动"""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+
+def load_script(path):
+    """读输入脚本，返回按时间排好的 [(毫秒, 按键码)]"""
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            t, key_name = line.split(None, 1)
+            try:
+                events.append((int(t), pygame.key.key_code(key_name.strip())))
+            except ValueError:
+                raise ValueError(f"{path}:{line_no}: 无法识别的输入 {line!r}")
+    events.sort(key=lambda e: e[0])
+    return events
+
+
+def run_headless(scene_name='snake', difficulty='EASY', duration_ms=None, script=(), render=False,
+                 size=(1280, 720), seed=None, profile=False):
+    """跑完一局并返回统计结果；script 是 [(毫秒, 按键码)]，render=False 时完全不绘制。
+    profile=True 时整局抓 cProfile/tracemalloc (见 core/diagnostics.py)"""
+    use_dummy_drivers()
+    if seed is not None:
+        random.seed(seed)
+    if duration_ms is None:
+        duration_ms = settings.TRAINING_DURATION * 1000
+
+    pygame.init()
+    screen = pygame.display.set_mode(size)
+    settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT = size
+
+    from core.app import GameManager
+    from core.diagnostics import scene_capture
+    game_manager = GameManager()
+    # 没有真实的帧耗时，画质调节没有意义
+    game_manager.quality = None
+    game_manager.difficulty = difficulty
+    # 跳过登录界面 (它会连网)，直接进目标场景。
+    # change_scene 要到下一次 update 才生效，先空跑一次 update(0) 切过去，否则 0 毫秒的脚本输入没有场景接收
+    game_manager.change_scene(scene_name)
+    game_manager.update(0)
+    if game_manager.current_scene is None:
+        pygame.quit()
+        raise ValueError(f"未知的场景 {scene_name}")
+
+    # 不画的时候每帧只推进一步，脚本里的输入能落在准确的时间点上
+    frame_ms = settings.SIM_STEP_MS if not render else 1000 // settings.FPS
+    script = list(script)
+    next_event = 0
+    sim_time = 0
+    frames = 0
+    if profile:
+        scene_capture.start()
+    start = time.perf_counter()
+
+    while sim_time < duration_ms and game_manager.is_running:
+        while next_event < len(script) and script[next_event][0] <= sim_time:
+            key = script[next_event][1]
+            game_manager.handle_input(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode=""))
+            next_event += 1
+
+        game_manager.update(frame_ms)
+        if render:
+            game_manager.draw(screen)
+        sim_time += frame_ms
+        frames += 1
+
+        if getattr(game_manager.current_scene, 'is_time_up', False):
+            break
+
+    wall_ms = (time.perf_counter() - start) * 1000
+    scene_capture.stop()
+    scene = game_manager.current_scene
+    result = {
+        'scene': type(scene).__name__,
+        'difficulty': difficulty,
+        'sim_ms': sim_time,
+        'wall_ms': wall_ms,
+        'frames': frames,
+        'speedup': sim_time / wall_ms if wall_ms > 0 else float('inf'),
+        'score': getattr(scene, 'current_score', None),
+        'high_score': getattr(scene, 'high_score', None),
+    }
+    pygame.quit()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无头模式：尽快跑完一局")
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--scene", default="snake")
+    parser.add_argument("--difficulty", default="EASY", choices=list(settings.DIFFICULTY_LEVELS))
+    parser.add_argument("--script", help="输入脚本，每行 '毫秒 按键'")
+    parser.add_argument("--render", action="store_true", help="每帧也绘制 (慢很多)")
+    parser.add_argument("--duration", type=float, help="模拟多少秒，默认 TRAINING_DURATION")
+    parser.add_argument("--size", default="1280x720", help="屏幕尺寸，例如 1920x1080")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--profile", action="store_true", help="抓 cProfile/tracemalloc，写到 DIAGNOSTICS_DIR")
+    args = parser.parse_args(argv)
+
+    use_dummy_drivers()
+    pygame.init()  # key_code 需要先初始化
+    script = load_script(args.script) if args.script else []
+    duration_ms = int(args.duration * 1000) if args.duration is not None else None
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+
+    result = run_headless(args.scene, args.difficulty, duration_ms, script, args.render, size, args.seed, args.profile)
+    print(f"Headless: {result['scene']} {result['difficulty']} 模拟 {result['sim_ms'] / 1000:.0f}s "
+          f"用时 {result['wall_ms'] / 1000:.2f}s (x{result['speedup']:.0f})，"
+          f"分数 {result['score']}，最高分 {result['high_score']}")
+    return result
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,95 @@
+# core/pattern_store.py
+# 背景图案的磁盘缓存：把 8 位调色板图案的像素索引原样写到文件里，
+# 下次启动用 mmap + pygame.image.frombuffer 零拷贝加载，不用重新生成。
+# 预热命令：python -m core.pattern_store [宽 高]
+import os
+import sys
+import mmap
+import pygame
+import settings
+
+# 图案格式或生成逻辑变了就加一，旧版本的文件会被自动忽略
+CACHE_VERSION = 1
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# frombuffer 出来的 Surface -> (Surface, 它背后的 mmap)。
+# pygame 不会替 Surface 持有这块内存，映射必须和 Surface 一起活着，Surface 不再使用时再由 unmap 一起关掉
+_mapped = {}
+
+
+def cache_dir():
+    return os.path.join(BASE_PATH, settings.BG_DISK_CACHE_DIR, f"v{CACHE_VERSION}")
+
+
+def pattern_path(kind, screen_size, param):
+    """例如 cache/patterns/v1/stripe_1920x1080_10.bin"""
+    w, h = screen_size
+    return os.path.join(cache_dir(), f"{kind}_{w}x{h}_{param}.bin")
+
+
+def load(kind, screen_size, param, surf_size):
+    """从磁盘映射一张 8 位图案，文件不存在或大小不对时返回 None"""
+    if not settings.BG_DISK_CACHE:
+        return None
+
+    path = pattern_path(kind, screen_size, param)
+    try:
+        with open(path, "rb") as f:
+            # ACCESS_COPY：只读映射，万一有人往 Surface 上画也不会写回文件
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    except (OSError, ValueError):
+        return None
+    if len(mm) != surf_size[0] * surf_size[1]:
+        mm.close()
+        return None
+
+    surf = pygame.image.frombuffer(mm, surf_size, "P")
+    _mapped[id(surf)] = (surf, mm)
+    return surf
+
+
+def save(kind, screen_size, param, surf):
+    """把 8 位图案的像素索引写到磁盘，先写临时文件再改名，读的一方不会读到半个文件"""
+    if not settings.BG_DISK_CACHE:
+        return
+
+    path = pattern_path(kind, screen_size, param)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(pygame.image.tobytes(surf, "P"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"PatternStore: 写入缓存失败 {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def exists(kind, screen_size, param):
+    return os.path.exists(pattern_path(kind, screen_size, param))
+
+
+def unmap(surf):
+    """Surface 从缓存里淘汰后调用：关掉它背后的映射 (不是 load 出来的 Surface 什么都不做)。
+    之后这个 Surface 不能再用，否则会读到已经解除映射的内存"""
+    entry = _mapped.pop(id(surf), None)
+    if entry is not None:
+        entry[1].close()
+
+
+if __name__ == "__main__":
+    from core.bg_renderer import warm_up_disk_cache
+
+    args = sys.argv[1:]
+    if len(args) >= 2:
+        size = (int(args[0]), int(args[1]))
+    else:
+        pygame.display.init()
+        size = pygame.display.get_desktop_sizes()[0]
+        pygame.display.quit()
+
+    print(f"PatternStore: 预热 {size[0]}x{size[1]} 的背景图案 -> {cache_dir()}")
+    built = warm_up_disk_cache(size)
+    print(f"PatternStore: 新生成 {built} 个图案")
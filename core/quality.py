@@ -0,0 +1,81 @@
+# core/quality.py
+# 自适应画质：旋转条栅的绘制耗时超出预算时逐级降低它的内部分辨率和旋转精度，
+# 有余量时再逐级恢复。降档会打印日志，方便治疗师知道刺激画面被降级过。
+import time
+from collections import deque
+import settings
+from core.bg_renderer import BackgroundRenderer
+
+
+class QualityGovernor:
+    # 缩放比例选 0.5：三个难度的条宽 (30/20/10) 缩小后仍是整数，放大回屏幕后条纹宽度不变
+    LEVELS = [
+        {'label': "FULL", 'scale': 1.0, 'step_mult': 1},
+        {'label': "STEP x2", 'scale': 1.0, 'step_mult': 2},
+        {'label': "50% STEP x2", 'scale': 0.5, 'step_mult': 2},
+        {'label': "50% STEP x4", 'scale': 0.5, 'step_mult': 4},
+    ]
+    # numpy / rotate 每帧都是现场计算，放大旋转步长省不了时间，只降分辨率
+    SCALE_ONLY_LEVELS = [
+        {'label': "FULL", 'scale': 1.0, 'step_mult': 1},
+        {'label': "50%", 'scale': 0.5, 'step_mult': 1},
+    ]
+
+    def __init__(self):
+        # 步长档位只在图集模式下有用：步长越大，一整圈要旋转生成的帧越少
+        self.levels = self.LEVELS if settings.BG_STRIPE_BACKEND == "atlas" else self.SCALE_ONLY_LEVELS
+        self.level = 0
+        self.history = []  # [(时间, 档位名, 平均背景耗时)]
+        self._samples = deque(maxlen=settings.QUALITY_WINDOW)
+        self._headroom_ms = 0
+        self._restore_hold_ms = settings.QUALITY_RESTORE_HOLD
+        self._last_restore = None
+
+    @property
+    def label(self):
+        label = self.levels[self.level]['label']
+        # 图集放不下一整圈时，一部分角度是现场算的：显示出来，别让 "FULL" 掩盖了每帧的额外开销
+        coverage = BackgroundRenderer.atlas_coverage()
+        if coverage is not None and coverage[0] < coverage[1]:
+            label += f" ATLAS {coverage[0]}/{coverage[1]}"
+        return label
+
+    def record(self, frame_ms):
+        """每个画了旋转条栅的帧调用一次，frame_ms 是这一帧画背景花的时间 (其他阶段的耗时和画质无关)"""
+        self._samples.append(frame_ms)
+        if len(self._samples) < self._samples.maxlen:
+            return
+
+        avg = sum(self._samples) / len(self._samples)
+        budget = 1000 / settings.FPS
+
+        # 超预算立刻降一档
+        if avg > budget * settings.QUALITY_DEGRADE_RATIO:
+            self._headroom_ms = 0
+            if self.level < len(self.levels) - 1:
+                # 刚恢复就又超预算：说明上一档扛不住，下次恢复前要等更久 (防止来回跳)
+                if self._last_restore is not None and time.time() - self._last_restore < self._restore_hold_ms / 1000 * 2:
+                    self._restore_hold_ms = min(self._restore_hold_ms * 2, settings.QUALITY_RESTORE_HOLD * 16)
+                self._set_level(self.level + 1, avg)
+            return
+
+        # 余量充足并且持续一段时间才升一档
+        if avg < budget * settings.QUALITY_RESTORE_RATIO and self.level > 0:
+            # tick 限帧后每帧大约就是一个预算的时长
+            self._headroom_ms += budget
+            if self._headroom_ms >= self._restore_hold_ms:
+                self._last_restore = time.time()
+                self._set_level(self.level - 1, avg)
+        else:
+            self._headroom_ms = 0
+
+    def _set_level(self, level, avg):
+        self.level = level
+        info = self.levels[level]
+        BackgroundRenderer.set_quality(info['scale'], info['step_mult'])
+        # 用 self.label：图集只缓存了一部分角度时，日志和历史里也要看得出来
+        label = self.label
+        self.history.append((time.time(), label, avg))
+        self._samples.clear()
+        self._headroom_ms = 0
+        print(f"QualityGovernor: 背景画质 -> {label} (平均背景耗时 {avg:.1f}ms)")
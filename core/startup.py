@@ -0,0 +1,53 @@
+# core/startup.py
+# 启动耗时报告：记录 import、pygame.init、设置显示模式、各场景构造等阶段，
+# 第一帧画出来时打印出来，首帧耗时超过 settings.STARTUP_BUDGET_MS 时给出警告。
+# 这个模块要在 main.py 里最先导入 (它自己不导入 pygame)，计时从导入时开始。
+import time
+from contextlib import contextmanager
+
+
+class StartupReport:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = []  # [(阶段名, 毫秒)]
+        self.first_frame_ms = None
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.start) * 1000
+
+    def add(self, name, ms):
+        self.phases.append((name, ms))
+        # 首帧之后才发生的阶段 (比如第一次进入游戏时构造场景) 直接打印
+        if self.first_frame_ms is not None:
+            print(f"Startup: {name} {ms:.1f}ms")
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def first_frame(self):
+        """第一帧显示出来后调用一次，打印报告"""
+        if self.first_frame_ms is not None:
+            return
+        self.first_frame_ms = self.elapsed_ms()
+        self.print_report()
+
+    def print_report(self):
+        import settings
+
+        print("--- Startup Report ---")
+        for name, ms in self.phases:
+            print(f"  {name:<24}{ms:>9.1f}ms")
+        budget = settings.STARTUP_BUDGET_MS
+        print(f"  {'first frame':<24}{self.first_frame_ms:>9.1f}ms (预算 {budget}ms)")
+        if self.first_frame_ms > budget:
+            slowest = max(self.phases, key=lambda p: p[1], default=None)
+            hint = f"，最慢的阶段是 {slowest[0]}" if slowest else ""
+            print(f"WARNING: 启动超出预算 {self.first_frame_ms - budget:.0f}ms{hint}")
+
+
+startup_report = StartupReport()
@@ -1,7 +1,55 @@
 # core/ui.py
 import pygame
+from collections import OrderedDict
+import settings
 from settings import COLORS
 
+
+class TextCache:
+    """文字 Surface 缓存：同样的 (字体, 文字, 颜色, 抗锯齿) 只 render 一次，按 LRU 淘汰"""
+
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surf = self._items.get(key)
+        if surf is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        # 转成显示格式，之后每帧 blit 更快
+        if pygame.display.get_surface():
+            surf = surf.convert_alpha()
+        self._items[key] = surf
+        if len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self._items.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._items)}
+
+
+# 所有界面共用一个缓存
+text_cache = TextCache(settings.TEXT_CACHE_SIZE)
+
+
+def render_text(font, text, color, antialias=True):
+    """代替 font.render：返回缓存的 Surface (调用方不要在上面画东西)"""
+    return text_cache.render(font, text, color, antialias)
+
+
 class Button:
     def __init__(self, x, y, width, height, text, font, text_color=COLORS['white'], bg_color=COLORS['blue'], hover_color=COLORS['red']):
         self.rect = pygame.Rect(x, y, width, height)
@@ -21,7 +69,7 @@ class Button:
         pygame.draw.rect(surface, COLORS['white'], self.rect, 2, border_radius=10) # 边框
 
         # 3. 画文字（居中）
-        text_surf = self.font.render(self.text, True, self.text_color)
+        text_surf = render_text(self.font, self.text, self.text_color)
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
 
@@ -78,9 +126,9 @@ class InputBox:
         
         if len(self.text) == 0 and not self.active:
             # 绘制占位符
-            txt_surf = self.font.render(self.placeholder, True, (150, 150, 150))
+            txt_surf = render_text(self.font, self.placeholder, (150, 150, 150))
         else:
-            txt_surf = self.font.render(display_text, True, COLORS['white'])
+            txt_surf = render_text(self.font, display_text, COLORS['white'])
             
         surface.blit(txt_surf, (self.rect.x + 5, self.rect.y + (self.rect.h - txt_surf.get_height())//2))
         
@@ -2,6 +2,7 @@
 import pygame
 import random
 from core.base_game import BaseGame
+from core.fonts import get_font
 from settings import COLORS, SCREEN_WIDTH, SCREEN_HEIGHT, DIFFICULTY_LEVELS
 
 class EyesightGame(BaseGame):
@@ -20,7 +21,7 @@ class EyesightGame(BaseGame):
         
         # 根据当前等级获取字体大小
         size = DIFFICULTY_LEVELS[self.current_level]['font_size']
-        self.font = pygame.font.SysFont("arial", size, bold=True)
+        self.font = get_font("arial", size, bold=True)
 
     def handle_input(self, event):
         # 不调用 super().handle_input，屏蔽背景切换和ESC
@@ -84,7 +85,7 @@ class EyesightGame(BaseGame):
         surface.blit(rotated_surf, rect)
 
         # 绘制UI提示
-        info_font = pygame.font.SysFont("arial", 20)
+        info_font = get_font("arial", 20)
         status = f"Level: {self.current_level} | Mistakes: {self.mistakes_in_row}/{self.max_mistakes}"
         surface.blit(info_font.render(status, True, COLORS['black']), (10, 10))
     
@@ -2,12 +2,15 @@ import pygame
 import sys
 import threading
 from core.base_game import BaseGame
-from core.ui import Button, InputBox
+from core.ui import Button, InputBox, render_text
 from core.data_manager import DataManager
+from core.fonts import get_font
 import settings
 from settings import COLORS
 
 class LoginScene(BaseGame):
+    IDLE_RENDERING = True
+
     def __init__(self, app):
         super().__init__(app)
         
@@ -18,8 +21,8 @@ class LoginScene(BaseGame):
         print("LoginScene: 正在后台连接数据库...")
         threading.Thread(target=self._async_connect, daemon=True).start()
             
-        self.font = pygame.font.SysFont("simhei", 30)
-        self.font_big = pygame.font.SysFont("simhei", 70, bold=True)
+        self.font = get_font("simhei", 30)
+        self.font_big = get_font("simhei", 70, bold=True)
         
         # --- 布局参数 ---
         cx = settings.SCREEN_WIDTH // 2
@@ -51,6 +54,7 @@ class LoginScene(BaseGame):
                 if self.dm.is_connected:
                     print("LoginScene: 后台连接成功!")
                     self.status_msg = "云端连接成功"
+                    self.request_redraw()
         except Exception as e:
             print(f"LoginScene: 连接错误 {e}")
 
@@ -171,7 +175,7 @@ class LoginScene(BaseGame):
         pygame.draw.rect(surface, (100, 100, 100), panel_rect, 2, border_radius=20)
         
         # 标题
-        title = self.font_big.render("MR 弱视训练系统", True, COLORS['white'])
+        title = render_text(self.font_big, "MR 弱视训练系统", COLORS['white'])
         title_rect = title.get_rect(center=(cx, self.title_y))
         surface.blit(title, title_rect)
         
@@ -183,6 +187,6 @@ class LoginScene(BaseGame):
         self.btn_exit.draw(surface)
         
         # 状态文字
-        msg_surf = self.font.render(self.status_msg, True, self.msg_color)
+        msg_surf = render_text(self.font, self.status_msg, self.msg_color)
         msg_rect = msg_surf.get_rect(center=(cx, cy + 220))
         surface.blit(msg_surf, msg_rect)
\ No newline at end of file
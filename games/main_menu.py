@@ -2,15 +2,18 @@
 import pygame
 import settings # 注意：这里我们要直接导入模块，以便访问动态更新后的宽高
 from core.base_game import BaseGame
-from core.ui import Button
+from core.ui import Button, render_text
 from core.data_manager import DataManager
+from core.fonts import get_font
 from settings import COLORS, DIFFICULTY_LEVELS
 
 class MainMenu(BaseGame):
+    IDLE_RENDERING = True
+
     def __init__(self, app):
         super().__init__(app)
-        self.font_title = pygame.font.SysFont("microsoftyahei", 80, bold=True)
-        self.font_btn = pygame.font.SysFont("microsoftyahei", 40)
+        self.font_title = get_font("microsoftyahei", 80, bold=True)
+        self.font_btn = get_font("microsoftyahei", 40)
         
         # 菜单状态: "选择游戏" 或 "选择难度"
         self.state = "选择游戏" 
@@ -53,6 +56,8 @@ class MainMenu(BaseGame):
                 if self.btns_game[0].is_clicked(event): # Snake
                     self.selected_game = 'snake'
                     self.state = "选择难度"
+                    # 用户挑难度的这几秒里，后台先把游戏场景和各难度的资源准备好
+                    self.app.warm_up_scene(self.selected_game)
                 elif self.btns_game[1].is_clicked(event): # Exit
                     self.app.is_running = False
             
@@ -85,7 +90,7 @@ class MainMenu(BaseGame):
         
         # 2. 绘制标题
         title_text = "GAME STATION" if self.state == "选择游戏" else "选择难度"
-        title_surf = self.font_title.render(title_text, True, COLORS['white'])
+        title_surf = render_text(self.font_title, title_text, COLORS['white'])
         title_rect = title_surf.get_rect(center=(settings.SCREEN_WIDTH // 2, 100))
         surface.blit(title_surf, title_rect)
 
@@ -97,6 +102,6 @@ class MainMenu(BaseGame):
         coins = DataManager().get_coins()
         coin_text = f"Coins: {coins}"
         # 用黄色显示
-        coin_surf = self.font_btn.render(coin_text, True, (255, 215, 0)) 
+        coin_surf = render_text(self.font_btn, coin_text, (255, 215, 0)) 
         # 显示在右上角
         surface.blit(coin_surf, (settings.SCREEN_WIDTH - coin_surf.get_width() - 20, 20))
\ No newline at end of file
@@ -0,0 +1,264 @@
+# games/snake/batch.py
+# 批量模拟：把 N 局互不相干的贪吃蛇放进 NumPy 数组一起推进 (蛇身环形缓冲、占用表、食物位置)，
+# 用简单的脚本/贪心策略代替玩家，几秒钟就能得到每个难度 "分数-时间" 的分布，用来调
+# DIFFICULTY_LEVELS、SPEED_ACCELERATION 和 MIN_MOVE_INTERVAL。
+# 规则和 games/snake/engine.py 一致：穿墙、撞到自己 (包括还没移走的尾巴) 就结算金币重开、倒计时不重置。
+# 用法：python -m games.snake.batch [--boards 1000] [--policy greedy] [--epsilon 0.1] [--size 1920x1080]
+import sys
+import time
+import argparse
+import numpy as np
+import settings
+from settings import DIFFICULTY_LEVELS
+from games.snake.engine import SnakeEngine, board_size
+
+# 方向编号：0 右、1 下、2 左、3 上；掉头就是 (d + 2) % 4
+DX = np.array([1, 0, -1, 0], dtype=np.int32)
+DY = np.array([0, 1, 0, -1], dtype=np.int32)
+
+POLICIES = ("straight", "random", "greedy")
+
+
+class BatchSnake:
+    def __init__(self, boards, cols, rows, base_speed, seed=None):
+        self.n = boards
+        self.cols, self.rows = cols, rows
+        self.cells = cols * rows
+        self.base_speed = base_speed
+        self.rng = np.random.default_rng(seed)
+
+        n, c = boards, self.cells
+        # 查表代替逐步计算：每格往四个方向走一步到哪格，任意两格之间穿墙后的曼哈顿距离
+        cell = np.arange(c)
+        col, row = cell % cols, cell // cols
+        self.neighbors = ((row[:, None] + DY) % rows) * cols + (col[:, None] + DX) % cols
+        dx = np.abs(col[:, None] - col[None, :])
+        dy = np.abs(row[:, None] - row[None, :])
+        # 多出来的一行一列给 "没有食物" (格子编号记为 c) 用，距离算成很远
+        self.dist = np.full((c + 1, c + 1), 2 * c, dtype=np.int32)
+        self.dist[:c, :c] = np.minimum(dx, cols - dx) + np.minimum(dy, rows - dy)
+
+        self.occ = np.zeros((n, c), dtype=bool)
+        self.food_mask = np.zeros((n, c), dtype=bool)
+        self.food_cells = np.full((n, SnakeEngine.FOOD_COUNT), c, dtype=np.int64)
+        # 蛇身环形缓冲：head_ptr 指向蛇头，往回数 length 格是整条蛇
+        self.body = np.zeros((n, c), dtype=np.int64)
+        self.head_ptr = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.dir = np.zeros(n, dtype=np.int64)
+
+        self.score = np.zeros(n, dtype=np.int64)
+        self.best = np.zeros(n, dtype=np.int64)      # 本次训练的最高分 (HUD 上的 "最高")
+        self.eaten = np.zeros(n, dtype=np.int64)     # 累计吃到的苹果
+        self.deaths = np.zeros(n, dtype=np.int64)
+        self.coins = np.zeros(n, dtype=np.int64)
+        self.elapsed = np.zeros(n, dtype=np.int64)   # 每局自己的时钟 (毫秒)，各局不需要同步
+
+        self._reset(np.arange(n))
+
+    def heads(self, idx):
+        return self.body[idx, self.head_ptr[idx]]
+
+    def move_interval(self, idx):
+        return np.maximum(settings.MIN_MOVE_INTERVAL,
+                          self.base_speed - self.score[idx] * settings.SPEED_ACCELERATION)
+
+    def _reset(self, idx):
+        """和 SnakeEngine.reset 一样：三节长的蛇摆在中间朝右，再放三个食物"""
+        start = (self.rows // 2) * self.cols + self.cols // 2
+        self.occ[idx] = False
+        self.food_mask[idx] = False
+        self.food_cells[idx] = self.cells
+        for k, cell in enumerate((start - 2, start - 1, start)):
+            self.body[idx, k] = cell
+            self.occ[idx, cell] = True
+        self.head_ptr[idx] = 2
+        self.length[idx] = 3
+        self.dir[idx] = 0
+        self.score[idx] = 0
+        for slot in range(SnakeEngine.FOOD_COUNT):
+            self._spawn(idx, np.full(len(idx), slot))
+
+    def _spawn(self, idx, slots):
+        """在空闲格里均匀随机放食物：先拒绝采样几轮，剩下很满的局用带掩码的随机数取最大值"""
+        cells = self.rng.integers(0, self.cells, size=len(idx))
+        pending = np.arange(len(idx))
+        for _ in range(8):
+            bad = self.occ[idx[pending], cells[pending]] | self.food_mask[idx[pending], cells[pending]]
+            pending = pending[bad]
+            if len(pending) == 0:
+                break
+            cells[pending] = self.rng.integers(0, self.cells, size=len(pending))
+        else:
+            bad = self.occ[idx[pending], cells[pending]] | self.food_mask[idx[pending], cells[pending]]
+            pending = pending[bad]
+            if len(pending):
+                rows = idx[pending]
+                noise = self.rng.random((len(pending), self.cells))
+                noise[self.occ[rows] | self.food_mask[rows]] = -1
+                cells[pending] = noise.argmax(axis=1)
+                # 场地满了就不放
+                full = noise.max(axis=1) < 0
+                cells[pending[full]] = self.cells
+
+        placed = cells < self.cells
+        self.food_cells[idx, slots] = cells
+        self.food_mask[idx[placed], cells[placed]] = True
+
+    def _candidates(self, idx):
+        """四个方向走一步后的格子，形状 (len(idx), 4)"""
+        return self.neighbors[self.heads(idx)]
+
+    def _safe_dirs(self, idx, cand):
+        """不掉头并且下一格没有蛇身的方向"""
+        safe = ~self.occ[idx[:, None], cand]
+        safe[np.arange(len(idx)), (self.dir[idx] + 2) % 4] = False
+        return safe
+
+    def policy_straight(self, idx):
+        """脚本策略：一直往前走 (穿墙绕圈)"""
+        return self.dir[idx]
+
+    def policy_random(self, idx):
+        """随机挑一个安全的方向，没有就直走"""
+        safe = self._safe_dirs(idx, self._candidates(idx))
+        noise = self.rng.random(safe.shape)
+        noise[~safe] = -1
+        choice = noise.argmax(axis=1)
+        return np.where(safe.any(axis=1), choice, self.dir[idx])
+
+    def policy_greedy(self, idx):
+        """朝最近的食物走 (按穿墙后的曼哈顿距离)，只看下一步是否安全"""
+        cand = self._candidates(idx)
+        safe = self._safe_dirs(idx, cand)
+
+        food = self.food_cells[idx]                          # (m, F)
+        dist = self.dist[cand[:, :, None], food[:, None, :]].min(axis=2)  # (m, 4)
+        dist[~safe] = self.cells * 4
+        return np.where(safe.any(axis=1), dist.argmin(axis=1), self.dir[idx])
+
+    def step(self, idx, new_dir):
+        """idx 这些局各走一步"""
+        self.elapsed[idx] += self.move_interval(idx)
+        reverse = new_dir == (self.dir[idx] + 2) % 4
+        self.dir[idx] = np.where(reverse, self.dir[idx], new_dir)
+
+        nh = self.neighbors[self.heads(idx), self.dir[idx]]
+
+        # 撞到自己 (尾巴这一步还没移走，所以也算)：结算金币后重开
+        dead = self.occ[idx, nh]
+        if dead.any():
+            self._game_over(idx[dead])
+        live, nh = idx[~dead], nh[~dead]
+
+        self.head_ptr[live] = (self.head_ptr[live] + 1) % self.cells
+        self.body[live, self.head_ptr[live]] = nh
+        self.occ[live, nh] = True
+
+        ate = self.food_mask[live, nh]
+        eaters, eat_cells = live[ate], nh[ate]
+        if len(eaters):
+            self.score[eaters] += 1
+            self.eaten[eaters] += 1
+            np.maximum(self.best, self.score, out=self.best)
+            self.length[eaters] += 1
+            self.food_mask[eaters, eat_cells] = False
+            slots = (self.food_cells[eaters] == eat_cells[:, None]).argmax(axis=1)
+            self.food_cells[eaters, slots] = -1
+            # 铺满整个场地：这一局赢了，同样结算后重开
+            won = self.length[eaters] == self.cells
+            if won.any():
+                self._game_over(eaters[won])
+            self._spawn(eaters[~won], slots[~won])
+
+        movers = live[~ate]
+        tail = self.body[movers, (self.head_ptr[movers] - self.length[movers]) % self.cells]
+        self.occ[movers, tail] = False
+
+    def _game_over(self, idx):
+        self.deaths[idx] += 1
+        self.coins[idx] += self.score[idx] // 10
+        self._reset(idx)
+
+    def run(self, duration_ms, policy="greedy", epsilon=0.0, checkpoint_ms=60000):
+        """跑完 duration_ms，返回每个检查点 (checkpoint_ms 的整数倍) 上各局的最高分和累计苹果数"""
+        choose = getattr(self, f"policy_{policy}")
+        checkpoints = int(duration_ms // checkpoint_ms)
+        best_at = np.zeros((self.n, checkpoints), dtype=np.int64)
+        eaten_at = np.zeros((self.n, checkpoints), dtype=np.int64)
+        all_boards = np.arange(self.n)
+
+        while True:
+            idx = all_boards[self.elapsed < duration_ms]
+            if len(idx) == 0:
+                break
+            new_dir = choose(idx)
+            if epsilon > 0:
+                # 以 epsilon 的概率乱走一步，模拟反应慢或者按错
+                noisy = self.rng.random(len(idx)) < epsilon
+                new_dir = np.where(noisy, self.rng.integers(0, 4, size=len(idx)), new_dir)
+
+            before = self.elapsed[idx] // checkpoint_ms
+            self.step(idx, new_dir)
+            # 每步最多 SPEED 上限那么长，远小于检查点间隔，所以一步最多跨过一个检查点
+            crossed = (self.elapsed[idx] // checkpoint_ms > before) & (before < checkpoints)
+            rows, k = idx[crossed], before[crossed]
+            best_at[rows, k] = self.best[rows]
+            eaten_at[rows, k] = self.eaten[rows]
+
+        return best_at, eaten_at
+
+
+def simulate(difficulty, boards=1000, duration_ms=None, policy="greedy", epsilon=0.0,
+             screen_size=(1920, 1080), checkpoint_ms=60000, seed=None):
+    if duration_ms is None:
+        duration_ms = settings.TRAINING_DURATION * 1000
+    _, cols, rows = board_size(screen_size[0], screen_size[1], difficulty)
+    sim = BatchSnake(boards, cols, rows, DIFFICULTY_LEVELS[difficulty]['snake_speed'], seed)
+    best_at, eaten_at = sim.run(duration_ms, policy, epsilon, checkpoint_ms)
+    return {
+        'difficulty': difficulty,
+        'board': (cols, rows),
+        'times_s': [(k + 1) * checkpoint_ms / 1000 for k in range(best_at.shape[1])],
+        'best_at': best_at,
+        'eaten_at': eaten_at,
+        'deaths': sim.deaths,
+        'coins': sim.coins,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量模拟贪吃蛇，输出每个难度的分数-时间分布")
+    parser.add_argument("--boards", type=int, default=1000)
+    parser.add_argument("--policy", default="greedy", choices=POLICIES)
+    parser.add_argument("--epsilon", type=float, default=0.0, help="每步乱走的概率")
+    parser.add_argument("--size", default="1920x1080", help="屏幕尺寸，决定场地格数")
+    parser.add_argument("--duration", type=float, help="模拟多少秒，默认 TRAINING_DURATION")
+    parser.add_argument("--checkpoint", type=float, default=60, help="每隔多少秒统计一次")
+    parser.add_argument("--difficulty", choices=list(DIFFICULTY_LEVELS), help="只跑一个难度")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    duration_ms = int(args.duration * 1000) if args.duration is not None else None
+    difficulties = [args.difficulty] if args.difficulty else list(DIFFICULTY_LEVELS)
+
+    print(f"{args.boards} 局/难度，策略 {args.policy} (epsilon {args.epsilon})，屏幕 {size[0]}x{size[1]}")
+    for difficulty in difficulties:
+        start = time.perf_counter()
+        result = simulate(difficulty, args.boards, duration_ms, args.policy, args.epsilon,
+                          size, int(args.checkpoint * 1000), args.seed)
+        elapsed = time.perf_counter() - start
+
+        cols, rows = result['board']
+        print(f"\n[{difficulty}] 场地 {cols}x{rows}，用时 {elapsed:.2f}s，"
+              f"平均撞死 {result['deaths'].mean():.1f} 次，平均金币 {result['coins'].mean():.1f}")
+        print(f"{'时间(s)':>8}{'最高分 p10':>12}{'p50':>8}{'p90':>8}{'苹果 p10':>11}{'p50':>8}{'p90':>8}")
+        for k, t in enumerate(result['times_s']):
+            b10, b50, b90 = np.percentile(result['best_at'][:, k], [10, 50, 90])
+            e10, e50, e90 = np.percentile(result['eaten_at'][:, k], [10, 50, 90])
+            print(f"{t:>8.0f}{b10:>12.0f}{b50:>8.0f}{b90:>8.0f}{e10:>11.0f}{e50:>8.0f}{e90:>8.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
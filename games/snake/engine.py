@@ -0,0 +1,161 @@
+# games/snake/engine.py
+# 贪吃蛇的规则：场地、移动、吃食物、加速和训练倒计时。
+# 不依赖 pygame (绘制、字体、金币结算都在 SnakeGame 里)，可以脱离窗口直接跑，
+# 也是 games/snake/batch.py 批量模拟的参照实现。
+import random
+from collections import deque
+import settings
+from settings import DIFFICULTY_LEVELS
+
+# 一步移动的结果
+MOVED = "moved"
+ATE = "ate"
+DIED = "died"    # 撞到自己
+WON = "won"      # 蛇铺满了整个场地
+
+
+def board_size(screen_width, screen_height, difficulty):
+    """某个分辨率和难度下的 (格子像素, 列数, 行数)"""
+    grid_size = max(20, screen_width // DIFFICULTY_LEVELS[difficulty]['snake_size'])
+    # 场地按整格计算：屏幕除不尽时穿墙也要落在同一套格子上，否则格子会互相重叠
+    return grid_size, screen_width // grid_size, screen_height // grid_size
+
+
+def move_interval_for(base_speed, score):
+    """动态速度：基础间隔减去 (当前分 * 加速系数)，不低于 MIN_MOVE_INTERVAL"""
+    return max(settings.MIN_MOVE_INTERVAL, base_speed - score * settings.SPEED_ACCELERATION)
+
+
+class SnakeEngine:
+    FOOD_COUNT = 3
+
+    def __init__(self, cols, rows, base_speed, total_time=None, rng=None):
+        # rng 默认用全局的 random，这样 random.seed 能复现一整局
+        self.rng = rng or random
+        self.total_time = settings.TRAINING_DURATION * 1000 if total_time is None else total_time
+        # 倒计时是整个训练的，撞死重开不重置
+        self.time_left = self.total_time
+        self.is_time_up = False
+        self.reset(cols, rows, base_speed)
+
+    def reset(self, cols=None, rows=None, base_speed=None):
+        """开新的一局 (可以顺便换场地大小和速度)"""
+        if cols is not None:
+            self.cols, self.rows = cols, rows
+        if base_speed is not None:
+            self.base_speed = base_speed
+        self.score = 0
+        self.move_interval = self.base_speed
+        self.move_timer = 0
+
+        # 蛇的位置 (格子编号 = 行 * cols + 列)
+        start = (self.rows // 2) * self.cols + self.cols // 2
+        self.direction = (1, 0)
+        self.foods = set()
+        self.place_snake([start, start - 1, start - 2], [self.direction] * 3)
+
+        for _ in range(self.FOOD_COUNT):
+            self.add_food()
+
+    def place_snake(self, cells, dirs):
+        """按给定的格子 (蛇头在前) 和每节的移动方向摆好蛇，并重建占用表"""
+        # 蛇用双端队列存格子编号：头部插入、尾部弹出都是 O(1)
+        self.snake = deque(cells)
+        # segment_dirs[i] 是第 i 节当蛇头时的移动方向，绘制时拿来选精灵
+        self.segment_dirs = deque(dirs)
+        # 占用表：每格一个字节，撞自己的判断是 O(1)
+        self.occupancy = bytearray(self.cols * self.rows)
+        for cell in self.snake:
+            self.occupancy[cell] = 1
+
+        # 空闲格索引：free_cells 存所有既没有蛇也没有食物的格子，
+        # free_index[格子] 是它在 free_cells 里的下标 (不空闲时为 -1)，增删都是 O(1)
+        self.free_cells = []
+        self.free_index = [-1] * (self.cols * self.rows)
+        for cell in range(self.cols * self.rows):
+            if not self.occupancy[cell] and cell not in self.foods:
+                self._release_cell(cell)
+
+    def _release_cell(self, cell):
+        """格子空出来了，加入空闲格索引"""
+        self.free_index[cell] = len(self.free_cells)
+        self.free_cells.append(cell)
+
+    def _take_cell(self, cell):
+        """格子被占了：和最后一个空闲格交换后弹出"""
+        i = self.free_index[cell]
+        last = self.free_cells.pop()
+        if last != cell:
+            self.free_cells[i] = last
+            self.free_index[last] = i
+        self.free_index[cell] = -1
+
+    def add_food(self):
+        """在空闲格里均匀随机选一格放食物；场地已满时不放"""
+        if not self.free_cells:
+            return
+        cell = self.free_cells[self.rng.randrange(len(self.free_cells))]
+        self._take_cell(cell)
+        self.foods.add(cell)
+
+    def turn(self, direction):
+        """改变方向，不能直接掉头；返回是否接受"""
+        if direction == (-self.direction[0], -self.direction[1]):
+            return False
+        self.direction = direction
+        return True
+
+    def update(self, dt, on_move=None):
+        """推进 dt 毫秒：倒计时，再按当前速度移动若干步 (多出来的时间留到下一步)。
+        每走一步调用 on_move(结果, 移走的尾巴格或 None)。撞死或铺满时停下，由调用方决定怎么重开"""
+        if self.time_left > 0:
+            self.time_left -= dt
+            if self.time_left <= 0:
+                self.time_left = 0
+                self.is_time_up = True
+
+        self.move_interval = move_interval_for(self.base_speed, self.score)
+        self.move_timer += dt
+        while self.move_timer >= self.move_interval:
+            self.move_timer -= self.move_interval
+            result, old_tail = self.move()
+            if on_move is not None:
+                on_move(result, old_tail)
+            if result in (DIED, WON):
+                self.move_timer = 0
+                return
+            # 吃到食物后间隔变短
+            self.move_interval = move_interval_for(self.base_speed, self.score)
+
+    def move(self):
+        """走一步，返回 (结果, 移走的尾巴格或 None)"""
+        head = self.snake[0]
+        dx, dy = self.direction
+
+        # 穿墙：行列各自取模
+        new_col = (head % self.cols + dx) % self.cols
+        new_row = (head // self.cols + dy) % self.rows
+        new_head = new_row * self.cols + new_col
+
+        # 撞到自己 (尾巴这一步还没移走，所以也算)
+        if self.occupancy[new_head]:
+            return DIED, None
+
+        self.snake.appendleft(new_head)
+        self.segment_dirs.appendleft(self.direction)
+        self.occupancy[new_head] = 1
+
+        if new_head in self.foods:
+            self.score += 1
+            self.foods.discard(new_head)
+            if len(self.snake) == self.cols * self.rows:
+                return WON, None
+            self.add_food()
+            return ATE, None
+
+        self._take_cell(new_head)
+        old_tail = self.snake.pop()
+        self.segment_dirs.pop()
+        self.occupancy[old_tail] = 0
+        self._release_cell(old_tail)
+        return MOVED, old_tail
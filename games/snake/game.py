@@ -1,55 +1,44 @@
 import pygame
-import random
-import os
 import settings
 from core.base_game import BaseGame
 from core.data_manager import DataManager
+from core.assets import assets
+from core.ui import render_text
+from core.fonts import get_font
+from games.snake.engine import SnakeEngine, board_size, ATE, DIED, WON
 from settings import COLORS, DIFFICULTY_LEVELS, GAME_GRID_RATIO
 
 class SnakeGame(BaseGame):
+    SUPPORTS_DIRTY_RECTS = True
+
     def __init__(self, app):
         super().__init__(app)
         
         # --- 1. 倒计时系统 ---
         self.total_time = settings.TRAINING_DURATION * 1000 
-        self.time_left = self.total_time
-        self.is_time_up = False
+        # 规则 (移动、食物、倒计时) 都在引擎里，这个类只管绘制、输入和结算；第一次 reset_game 时创建
+        self.engine = None
         
         # --- 2. 分数系统 (内存版) ---
         self.high_score = 0  # 【修改】初始化为0，不读取文件
-        self.current_score = 0
         
-        # 字体
-        try:
-            # 尝试加载中文字体，如果没有则回退
-            base_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-            font_path = os.path.join(base_path, 'assets', 'fonts', 'simhei.ttf') # 如果你有放字体文件
-            # self.font_ui = pygame.font.Font(font_path, 24) 
-            self.font_ui = pygame.font.SysFont("simhei", 24)
-            self.font_msg = pygame.font.SysFont("simhei", 60, bold=True)
-        except:
-            self.font_ui = pygame.font.SysFont("arial", 24)
-            self.font_msg = pygame.font.SysFont("arial", 60, bold=True)
+        # 字体 (系统里没有黑体时注册表会回退到自带字体)
+        self.font_ui = get_font("simhei", 24)
+        self.font_msg = get_font("simhei", 60, bold=True)
         
         # --- 3. 资源加载 ---
         self.images_loaded = False
+        self.has_corner = False
+        self.sprite_atlas = {}       # (精灵名, 角度) -> 预先旋转好的 Surface
+        self._sprite_grid_size = None
+        # 格子大小 -> 缩放好的全套精灵 (预热线程提前放进来，reset_game 直接取)
+        self._sprite_sets = {}
         try:
-            base_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-            img_dir = os.path.join(base_path, 'assets', 'images')
-            
-            self.raw_head = pygame.image.load(os.path.join(img_dir, 'snake_head.png')).convert_alpha()
-            self.raw_body = pygame.image.load(os.path.join(img_dir, 'snake_body.png')).convert_alpha()
-            
-            # 尝试加载尾巴和转角 (如果文件存在)
-            p_tail = os.path.join(img_dir, 'snake_tail.png')
-            if os.path.exists(p_tail):
-                self.raw_tail = pygame.image.load(p_tail).convert_alpha()
-            
-            p_corner = os.path.join(img_dir, 'snake_corner.png')
-            if os.path.exists(p_corner):
-                self.raw_corner = pygame.image.load(p_corner).convert_alpha()
-                
-            self.raw_food = pygame.image.load(os.path.join(img_dir, 'apple.png')).convert_alpha()
+            # 图片由 AssetManager 统一加载，每张只读一次
+            for name in ('snake_head', 'snake_body', 'apple'):
+                assets.image(name)
+            # 尾巴和转角是可选的：没有尾巴用身体代替，没有转角就画直身
+            self.has_corner = assets.has_image('snake_corner')
             
             self.images_loaded = True
             print("Snake images loaded successfully!")
@@ -61,6 +50,18 @@ class SnakeGame(BaseGame):
 
     # 【删除】 _load_high_score 和 _save_high_score 方法都被移除了
 
+    @property
+    def current_score(self):
+        return self.engine.score if self.engine else 0
+
+    @property
+    def time_left(self):
+        return self.engine.time_left
+
+    @property
+    def is_time_up(self):
+        return self.engine.is_time_up
+
     def reset_game(self):
         """蛇死亡或重新开始时调用"""
         if self.current_score > 0:
@@ -75,206 +76,216 @@ class SnakeGame(BaseGame):
         if self.current_score > self.high_score:
             self.high_score = self.current_score
             
-        # 重置当前分
-        self.current_score = 0
-        
         # 读取配置
         diff_key = self.app.difficulty 
         diff_settings = DIFFICULTY_LEVELS[diff_key]
         
-        # 速度设置
-        self.base_speed = diff_settings['snake_speed']
-        self.move_interval = self.base_speed
-        
         # 尺寸设置
-        self.grid_size = settings.SCREEN_WIDTH // diff_settings['snake_size']
-        self.grid_size = max(20, self.grid_size)
+        self.grid_size, cols, rows = board_size(settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT, diff_key)
+
+        # 图片缩放 (格子大小没变时沿用上次的结果)
+        if self.images_loaded and self.grid_size != self._sprite_grid_size:
+            images, self.sprite_atlas = self._get_sprite_set(self.grid_size)
+            self.img_food = images['food']
+            self._sprite_grid_size = self.grid_size
+
+        if self.engine is None:
+            self.engine = SnakeEngine(cols, rows, diff_settings['snake_speed'], self.total_time)
+        else:
+            self.engine.reset(cols, rows, diff_settings['snake_speed'])
+        self._rebuild_sprites()
+
+    def _place_snake(self, cells, dirs):
+        """按给定的格子 (蛇头在前) 和每节的移动方向摆好蛇 (基准测试用)"""
+        self.engine.place_snake(cells, dirs)
+        self._rebuild_sprites()
 
-        # 图片缩放
+    def _rebuild_sprites(self):
+        # 每节的精灵在移动时就算好，绘制时不再逐节推算
+        self.cell_sprites = {}       # 格子编号 -> (精灵名, 角度)
+        # 格子编号 -> (旋转好的精灵 Surface, 坐标)，绘制时整个交给一次 surface.blits
+        self._snake_blits = {}
+        self._dirty_cells = set()
+        for i in range(len(self.engine.snake)):
+            self._refresh_segment(i)
+        # 重开一局：旧蛇在屏幕上的位置也要刷新
+        self._full_redraw = True
+
+    def _cell_pos(self, cell):
+        """格子编号 -> 屏幕像素坐标"""
+        cols = self.engine.cols
+        return ((cell % cols) * self.grid_size, (cell // cols) * self.grid_size)
+
+    def prepare(self, difficulty):
+        """预热线程：提前缩放好这个难度的精灵，再准备背景图案"""
         if self.images_loaded:
-            self.img_head = pygame.transform.scale(self.raw_head, (self.grid_size, self.grid_size))
-            self.img_body = pygame.transform.scale(self.raw_body, (self.grid_size, self.grid_size))
-            if hasattr(self, 'raw_tail'):
-                self.img_tail = pygame.transform.scale(self.raw_tail, (self.grid_size, self.grid_size))
-            if hasattr(self, 'raw_corner'):
-                self.img_corner = pygame.transform.scale(self.raw_corner, (self.grid_size, self.grid_size))
-            self.img_food = pygame.transform.scale(self.raw_food, (self.grid_size, self.grid_size))
-
-        # 蛇的位置
-        start_x = (settings.SCREEN_WIDTH // self.grid_size // 2) * self.grid_size
-        start_y = (settings.SCREEN_HEIGHT // self.grid_size // 2) * self.grid_size
-        
-        self.snake = [
-            (start_x, start_y),
-            (start_x - self.grid_size, start_y),
-            (start_x - 2 * self.grid_size, start_y)
-        ]
-        self.direction = (1, 0)
-        self.move_timer = 0
-        
-        self.foods = []
-        for _ in range(3):
-            self._add_new_food()
-
-    def _add_new_food(self):
-        cols = settings.SCREEN_WIDTH // self.grid_size
-        rows = settings.SCREEN_HEIGHT // self.grid_size
-        while True:
-            x = random.randint(0, cols - 1) * self.grid_size
-            y = random.randint(0, rows - 1) * self.grid_size
-            pos = (x, y)
-            if pos not in self.snake and pos not in self.foods:
-                self.foods.append(pos)
-                break
+            grid_size, _, _ = board_size(settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT, difficulty)
+            self._get_sprite_set(grid_size)
+        super().prepare(difficulty)
+
+    def _get_sprite_set(self, grid_size):
+        """某个格子大小的 (缩放好的图片, 旋转图集)，同一个大小只做一次"""
+        sprite_set = self._sprite_sets.get(grid_size)
+        if sprite_set is None:
+            size = (grid_size, grid_size)
+            images = {
+                'head': assets.scaled('snake_head', size),
+                'body': assets.scaled('snake_body', size),
+                'tail': assets.scaled('snake_tail', size, fallback='snake_body'),
+                'food': assets.scaled('apple', size),
+            }
+            if self.has_corner:
+                images['corner'] = assets.scaled('snake_corner', size)
+            sprite_set = (images, self._build_sprite_atlas(images))
+            # 预热线程和主线程可能同时做同一个大小，结果一样，谁先写都行
+            self._sprite_sets[grid_size] = sprite_set
+        return sprite_set
+
+    @staticmethod
+    def _build_sprite_atlas(images):
+        """每种精灵只有四个朝向，缩放后一次性旋转好，绘制时只查表"""
+        atlas = {}
+        for name in ('head', 'body', 'tail', 'corner'):
+            img = images.get(name)
+            if img is None:
+                continue
+            for angle in (0, 90, 180, 270):
+                rotated = pygame.transform.rotate(img, angle)
+                if pygame.display.get_surface():
+                    rotated = rotated.convert_alpha()
+                atlas[(name, angle)] = rotated
+        return atlas
 
     def handle_input(self, event):
         super().handle_input(event)
         if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_UP and self.direction != (0, 1):
-                self.direction = (0, -1)
-            elif event.key == pygame.K_DOWN and self.direction != (0, -1):
-                self.direction = (0, 1)
-            elif event.key == pygame.K_LEFT and self.direction != (1, 0):
-                self.direction = (-1, 0)
-            elif event.key == pygame.K_RIGHT and self.direction != (-1, 0):
-                self.direction = (1, 0)
+            if event.key == pygame.K_UP: self.engine.turn((0, -1))
+            elif event.key == pygame.K_DOWN: self.engine.turn((0, 1))
+            elif event.key == pygame.K_LEFT: self.engine.turn((-1, 0))
+            elif event.key == pygame.K_RIGHT: self.engine.turn((1, 0))
 
     def update(self, dt):
         super().update(dt) 
-        
-        # 1. 倒计时
-        if self.time_left > 0:
-            self.time_left -= dt
-            if self.time_left <= 0:
-                self.time_left = 0
-                self.is_time_up = True
-
-        # 2. 动态速度
-        # 基础速度减去 (当前分 * 加速系数)
-        dynamic_speed = self.base_speed - (self.current_score * settings.SPEED_ACCELERATION)
-        self.move_interval = max(settings.MIN_MOVE_INTERVAL, dynamic_speed)
-
-        # 3. 移动
-        self.move_timer += dt
-        if self.move_timer > self.move_interval:
-            self.move_snake()
-            self.move_timer = 0
+        # 倒计时、动态速度和移动都在引擎里；每走一步回调一次，更新精灵
+        self.engine.update(dt, self._on_move)
 
     def move_snake(self):
-        head_x, head_y = self.snake[0]
-        dx, dy = self.direction
-        
-        new_x = (head_x + dx * self.grid_size) % settings.SCREEN_WIDTH
-        new_y = (head_y + dy * self.grid_size) % settings.SCREEN_HEIGHT
-        new_head = (new_x, new_y)
+        """立刻走一步 (不看计时)"""
+        self._on_move(*self.engine.move())
 
-        # 撞到自己
-        if new_head in self.snake:
-            self.reset_game() 
+    def _on_move(self, result, old_tail):
+        # 撞到自己，或者蛇铺满了整个场地 (这一局赢了)：结算金币后开新的一局
+        if result == DIED:
+            self.reset_game()
+            return
+        if result == WON:
+            print("Board filled! You win this round.")
+            self.reset_game()
             return
 
-        self.snake.insert(0, new_head)
-        
-        # 吃到食物
-        if new_head in self.foods:
-            self.current_score += 1 
-            
-            # 【修改】实时更新最高分 (打破纪录时立即显示)
-            if self.current_score > self.high_score:
-                self.high_score = self.current_score
-                
-            self.foods.remove(new_head)
-            self._add_new_food()
-        else:
-            self.snake.pop()
+        # 【修改】实时更新最高分 (打破纪录时立即显示)
+        if result == ATE and self.current_score > self.high_score:
+            self.high_score = self.current_score
 
-    def _get_neighbor_direction(self, current, target):
-        dx = target[0] - current[0]
-        dy = target[1] - current[1]
-        
-        if dx > settings.SCREEN_WIDTH / 2: dx = -self.grid_size
-        elif dx < -settings.SCREEN_WIDTH / 2: dx = self.grid_size
-        if dy > settings.SCREEN_HEIGHT / 2: dy = -self.grid_size
-        elif dy < -settings.SCREEN_HEIGHT / 2: dy = self.grid_size
+        if old_tail is not None:
+            del self.cell_sprites[old_tail]
+            self._snake_blits.pop(old_tail, None)
+            self._dirty_cells.add(old_tail)
+            # 新的尾巴换成尾巴精灵
+            self._refresh_segment(len(self.engine.snake) - 1)
+
+        # 新头和原来的头 (现在是脖子)
+        self._refresh_segment(0)
+        self._refresh_segment(1)
+
+    @staticmethod
+    def _direction_angle(direction):
+        dx, dy = direction
+        if dx == 1: return 0
+        if dx == -1: return 180
+        if dy == 1: return 270
+        if dy == -1: return 90
+        return 0
+
+    def _segment_sprite(self, i):
+        """第 i 节的 (精灵名, 角度)。
+        segment_dirs[i] 是这一节当蛇头时的移动方向，也就是它指向前一节的方向，
+        所以不用再拿坐标差去算 (也就不用处理穿墙的情况)"""
+        segment_dirs = self.engine.segment_dirs
+        # A. 头
+        if i == 0:
+            return ('head', self._direction_angle(segment_dirs[0]))
+
+        p_dir = segment_dirs[i - 1]
+
+        # B. 尾
+        if i == len(self.engine.snake) - 1:
+            return ('tail', self._direction_angle(p_dir))
+
+        # C. 身
+        n_dir = (-segment_dirs[i][0], -segment_dirs[i][1])
+        if p_dir[0] == n_dir[0] or p_dir[1] == n_dir[1]:
+            # 直身
+            return ('body', 0 if p_dir[0] != 0 else 90)
 
-        if dx != 0: dx = dx // abs(dx)
-        if dy != 0: dy = dy // abs(dy)
-        return (dx, dy)
+        # 拐弯 (如果有图片)
+        if not self.has_corner:
+            return ('body', 0)
+        dirs = {p_dir, n_dir}
+        angle = 0
+        if (-1, 0) in dirs and (0, -1) in dirs: angle = 0
+        elif (0, -1) in dirs and (1, 0) in dirs: angle = 270
+        elif (1, 0) in dirs and (0, 1) in dirs: angle = 180
+        elif (0, 1) in dirs and (-1, 0) in dirs: angle = 90
+        return ('corner', angle)
+
+    def _refresh_segment(self, i):
+        """重新计算第 i 节的精灵，并记下这一格在脏矩形刷新时要更新"""
+        cell = self.engine.snake[i]
+        sprite = self._segment_sprite(i)
+        self.cell_sprites[cell] = sprite
+        if self.images_loaded:
+            self._snake_blits[cell] = (self.sprite_atlas[sprite], self._cell_pos(cell))
+        self._dirty_cells.add(cell)
+
+    def _draw_snake(self, surface):
+        """每节直接贴预先旋转好的精灵，只有格子大小的 blit，不碰整屏"""
+        if self.images_loaded:
+            surface.blits(iter(self._snake_blits.values()), doreturn=False)
+        else:
+            for cell in self.cell_sprites:
+                surface.fill((0, 255, 0), (*self._cell_pos(cell), self.grid_size, self.grid_size))
+
+        # 屏幕上只有上次移动改动过的格子需要刷新
+        if self._full_redraw:
+            self.mark_dirty(surface.get_rect())
+            self._full_redraw = False
+        else:
+            for cell in self._dirty_cells:
+                self.mark_dirty((*self._cell_pos(cell), self.grid_size, self.grid_size))
+        self._dirty_cells.clear()
 
     def draw_content(self, surface):
         # 1. 绘制苹果
-        for food_pos in self.foods:
+        for food in self.engine.foods:
+            food_pos = self._cell_pos(food)
+            self.mark_dirty((*food_pos, self.grid_size, self.grid_size))
             if self.images_loaded: surface.blit(self.img_food, food_pos)
             else: pygame.draw.rect(surface, COLORS['red'], (*food_pos, self.grid_size, self.grid_size))
 
-        # 2. 绘制蛇 (请把之前那个包含 Corner/Tail 完整逻辑的代码块贴在这里)
-        # 这里为了演示方便，我放一个简化版，实际请务必使用你之前修复好的那个完整版本
-        for i, segment in enumerate(self.snake):
-            rect_pos = (segment[0], segment[1])
-            
-            if not self.images_loaded:
-                pygame.draw.rect(surface, (0, 255, 0), (*segment, self.grid_size, self.grid_size))
-                continue
-
-            img_to_draw = None
-            angle = 0
-            
-            # A. 头
-            if i == 0:
-                img_to_draw = self.img_head
-                if len(self.snake) > 1:
-                    neck = self.snake[1]
-                    dx, dy = self._get_neighbor_direction(neck, segment)
-                else:
-                    dx, dy = self.direction
-                
-                if dx == 1: angle = 0
-                elif dx == -1: angle = 180
-                elif dy == 1: angle = 270
-                elif dy == -1: angle = 90
-            
-            # B. 尾
-            elif i == len(self.snake) - 1:
-                # 如果有尾巴图片就用，没有就用身体
-                img_to_draw = getattr(self, 'img_tail', self.img_body)
-                prev = self.snake[i - 1]
-                dx, dy = self._get_neighbor_direction(segment, prev)
-                if dx == 1: angle = 0
-                elif dx == -1: angle = 180
-                elif dy == 1: angle = 270
-                elif dy == -1: angle = 90
-
-            # C. 身
-            else:
-                img_to_draw = self.img_body
-                prev = self.snake[i - 1]
-                next_seg = self.snake[i + 1]
-                
-                p_dir = self._get_neighbor_direction(segment, prev)
-                n_dir = self._get_neighbor_direction(segment, next_seg)
-
-                if p_dir[0] == n_dir[0] or p_dir[1] == n_dir[1]:
-                    # 直身
-                    if p_dir[0] != 0: angle = 0
-                    else: angle = 90
-                else:
-                    # 拐弯 (如果有图片)
-                    if hasattr(self, 'img_corner'):
-                        img_to_draw = self.img_corner
-                        dirs = {p_dir, n_dir}
-                        if (-1, 0) in dirs and (0, -1) in dirs: angle = 0
-                        elif (0, -1) in dirs and (1, 0) in dirs: angle = 270
-                        elif (1, 0) in dirs and (0, 1) in dirs: angle = 180
-                        elif (0, 1) in dirs and (-1, 0) in dirs: angle = 90
-            
-            if img_to_draw:
-                rotated_img = pygame.transform.rotate(img_to_draw, angle)
-                surface.blit(rotated_img, rect_pos)
+        # 2. 绘制蛇
+        self._draw_snake(surface)
 
         # 3. 绘制 UI
         self._draw_ui(surface)
 
     def _draw_ui(self, surface):
+        # 只有显示的秒数、分数、最高分或完成提示变了才重新合成 HUD
+        seconds = int(self.time_left / 1000)
+        state = (seconds, self.current_score, self.high_score, self.is_time_up)
+        self.draw_hud(surface, state, self._compose_hud)
+
+    def _compose_hud(self, layer):
         seconds = int(self.time_left / 1000)
         minutes = seconds // 60
         secs = seconds % 60
@@ -284,28 +295,31 @@ class SnakeGame(BaseGame):
         # 最高分是本次会话的最高分
         high_str = f"最高: {self.high_score}"
         
-        # 背景条
-        s = pygame.Surface((settings.SCREEN_WIDTH, 40))
-        s.set_alpha(150)
-        s.fill((0, 0, 0))
-        surface.blit(s, (0,0))
+        # 背景条 (半透明黑)
+        bar_rect = pygame.Rect(0, 0, settings.SCREEN_WIDTH, 40)
+        layer.fill((0, 0, 0, 150), bar_rect)
 
-        txt_time = self.font_ui.render(time_str, True, COLORS['white'])
-        txt_score = self.font_ui.render(score_str, True, COLORS['white'])
-        txt_high = self.font_ui.render(high_str, True, COLORS['yellow'])
+        txt_time = render_text(self.font_ui, time_str, COLORS['white'])
+        txt_score = render_text(self.font_ui, score_str, COLORS['white'])
+        txt_high = render_text(self.font_ui, high_str, COLORS['yellow'])
 
         # 布局
-        surface.blit(txt_score, (20, 10))
-        surface.blit(txt_time, (settings.SCREEN_WIDTH // 2 - txt_time.get_width() // 2, 10))
-        surface.blit(txt_high, (settings.SCREEN_WIDTH - 20 - txt_high.get_width(), 10))
-
-        if self.is_time_up:
-            msg = "训练完成！"
-            msg_surf = self.font_msg.render(msg, True, COLORS['red'])
-            msg_bg = self.font_msg.render(msg, True, COLORS['white'])
-            
-            cx = settings.SCREEN_WIDTH // 2
-            cy = settings.SCREEN_HEIGHT // 2
-            
-            surface.blit(msg_bg, (cx - msg_surf.get_width()//2 + 2, cy - msg_surf.get_height()//2 + 2))
-            surface.blit(msg_surf, (cx - msg_surf.get_width()//2, cy - msg_surf.get_height()//2))
\ No newline at end of file
+        layer.blit(txt_score, (20, 10))
+        layer.blit(txt_time, (settings.SCREEN_WIDTH // 2 - txt_time.get_width() // 2, 10))
+        layer.blit(txt_high, (settings.SCREEN_WIDTH - 20 - txt_high.get_width(), 10))
+
+        if not self.is_time_up:
+            return bar_rect
+
+        msg = "训练完成！"
+        msg_surf = render_text(self.font_msg, msg, COLORS['red'])
+        msg_bg = render_text(self.font_msg, msg, COLORS['white'])
+        
+        cx = settings.SCREEN_WIDTH // 2
+        cy = settings.SCREEN_HEIGHT // 2
+        
+        layer.blit(msg_bg, (cx - msg_surf.get_width()//2 + 2, cy - msg_surf.get_height()//2 + 2))
+        layer.blit(msg_surf, (cx - msg_surf.get_width()//2, cy - msg_surf.get_height()//2))
+        msg_rect = pygame.Rect(cx - msg_surf.get_width()//2, cy - msg_surf.get_height()//2,
+                               msg_surf.get_width() + 2, msg_surf.get_height() + 2)
+        return bar_rect.union(msg_rect)
@@ -1,33 +1,48 @@
 # main.py (Debug 版本)
+# 启动计时从这里开始，所以要最先导入
+from core.startup import startup_report
 import pygame
 import sys
 import settings
 from core.app import GameManager
+from core.bg_renderer import start_disk_cache_warm_up
+from core.ui import text_cache
+from core.frame_profiler import frame_profiler, EVENTS, UPDATE, FLIP
+from core.diagnostics import scene_capture
+
+startup_report.add("import", startup_report.elapsed_ms())
 
 def main():
     print("--- STEP 1: Pygame Init ---")
-    pygame.init()
-    pygame.font.init()
+    with startup_report.phase("pygame.init"):
+        pygame.init()
+        pygame.font.init()
     
     print("--- STEP 2: Setting Window Mode ---")
     # 全屏启动
-    screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    with startup_report.phase("display.set_mode"):
+        screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
     
     print("--- STEP 3: Getting Display Info ---")
     info = pygame.display.Info()
     settings.SCREEN_WIDTH = info.current_w
     settings.SCREEN_HEIGHT = info.current_h
     print(f"Screen Size: {settings.SCREEN_WIDTH}x{settings.SCREEN_HEIGHT}")
+
+    # 后台预热背景图案的磁盘缓存 (已有缓存时几乎不花时间)
+    start_disk_cache_warm_up((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
     
     pygame.display.set_caption(settings.WINDOW_TITLE)
-    clock = pygame.time.Clock()
 
     print("--- STEP 4: Initializing GameManager ---")
-    game_manager = GameManager()
+    with startup_report.phase("GameManager"):
+        game_manager = GameManager()
+    # 用 GameManager 的时钟：FPS 显示和画质调节都读它
+    clock = game_manager.clock
     
     print("--- STEP 5: Loading Scenes (Possbile Freeze Here) ---")
-    # 这里的 load_scenes 会初始化 LoginScene，LoginScene 会初始化 DataManager，
-    # DataManager 会尝试连接网络。如果不打印 STEP 6，说明死在网络上了。
+    # 这里的 load_scenes 只初始化 LoginScene，其他场景第一次进入时才构造。
+    # LoginScene 会在后台线程里连接网络。如果不打印 STEP 6，说明卡在场景构造上了。
     game_manager.load_scenes()
     
     print("--- STEP 6: Scenes Loaded Successfully ---")
@@ -38,26 +53,55 @@ def main():
     else:
         print("ERROR: Login scene not found!")
 
+    # --profile：从第一帧开始抓 cProfile/tracemalloc (也可以在游戏里按 F5)
+    if "--profile" in sys.argv:
+        scene_capture.start()
+
     print("--- STEP 7: Starting Main Loop ---")
     while game_manager.is_running:
-        dt = clock.tick(settings.FPS)
+        if game_manager.is_idle():
+            # 静态界面：阻塞等待输入，超时后也重画一次兜底
+            first_event = pygame.event.wait(settings.IDLE_REDRAW_INTERVAL)
+            events = [first_event] + pygame.event.get()
+            # 等待的时间不算进 dt，否则刚切进游戏场景的第一帧会跳一大步
+            dt = min(clock.tick(), 1000 // settings.FPS)
+        else:
+            dt = clock.tick(settings.FPS)
+            events = pygame.event.get()
+        frame_profiler.begin_frame()
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 game_manager.is_running = False
             # 传递事件
             game_manager.handle_input(event)
+        frame_profiler.lap(EVENTS)
 
         game_manager.update(dt)
-        game_manager.draw(screen)
+        frame_profiler.lap(UPDATE)
+        dirty_rects = game_manager.draw(screen)
 
-        pygame.display.flip()
+        # 纯色背景时只刷新变化的区域，动画背景时整屏 flip
+        if dirty_rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty_rects)
+        frame_profiler.lap(FLIP)
+        frame_profiler.end_frame()
+        startup_report.first_frame()
 
     print("--- Game Exiting ---")
+    scene_capture.stop()
+    print(f"Text cache: {text_cache.stats()}")
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
+    if "--headless" in sys.argv:
+        # 无头模式：不开窗口，尽快跑完一局 (参数见 core/headless.py)
+        from core.headless import main as headless_main
+        headless_main(sys.argv[1:])
+        sys.exit()
     try:
         main()
     except Exception as e: